@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Run yamlfixer's benchmarks and output their results as JSON."""
+
+import sys
+import os
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+from yamlfixer import __version__
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.filefixer import FileFixer
+from yamlfixer.linter import getlinter
+from yamlfixer.scanner import Scanner
+
+from .corpus import generate, configdata
+
+BENCHMARKS = ("fix", "scan", "diff", "commandline", "startup")
+
+# Maximum time --version may take on top of the interpreter's own startup
+STARTUPBUDGET = 0.05
+
+
+def measure(repeat, function, *args):
+    """Return the best duration in seconds of several calls to a function."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def result(name, paths, seconds):
+    """Return a benchmark's result."""
+    nbbytes = sum(os.path.getsize(path) for path in paths)
+    return {"name": name,
+            "files": len(paths),
+            "bytes": nbbytes,
+            "seconds": seconds,
+            "filespersecond": len(paths) / seconds if seconds else None,
+            "bytespersecond": nbbytes / seconds if seconds else None}
+
+
+def configured(options, paths):
+    """Return the (path, arguments, linter) tuples to fix each path with its own yamllint configuration."""
+    setups = {}
+    configurations = []
+    for path in paths:
+        confdata = configdata(path)
+        if confdata not in setups:
+            arguments = parse_commandline([*options, "-C", confdata, "file.yml"])
+            setups[confdata] = (arguments, getlinter(arguments))
+        configurations.append((path, *setups[confdata]))
+    return configurations
+
+
+def bench_fix(corpora, repeat):
+    """Measure FileFixer.fix() on each corpus, without modifying files."""
+    def fixall(configurations):
+        for (path, arguments, linter) in configurations:
+            FileFixer(arguments, path, linter).fix()
+    return [result(f"fix-{name}", paths,
+                   measure(repeat, fixall, configured(["--nocache", "--nochange"], paths)))
+            for (name, paths) in sorted(corpora.items())]
+
+
+def bench_scan(directory, corpora, repeat):
+    """Measure the scanning of the corpora's directories."""
+    arguments = parse_commandline(["--nocache", "--recurse", "-1", directory])
+
+    def scanall():
+        for _ in Scanner(arguments).scan(directory):
+            pass
+    paths = [path for paths in corpora.values() for path in paths]
+    return [result("scan", paths, measure(repeat, scanall))]
+
+
+def bench_diff(corpora, repeat):
+    """Measure the generation of unified diffs from the edits of a fixing pass."""
+    def diffall(fixers):
+        for filefixer in fixers:
+            filefixer.diff(filefixer.outcontents)
+    results = []
+    for name in ("huge", "dense"):
+        fixers = []
+        for (path, arguments, linter) in configured(["--nocache", "--nochange", "--maxpasses", "1"],
+                                                    corpora[name]):
+            filefixer = FileFixer(arguments, path, linter)
+            filefixer.fix()
+            fixers.append(filefixer)
+        results.append(result(f"diff-{name}", corpora[name], measure(repeat, diffall, fixers)))
+    return results
+
+
+def bench_commandline(directory, corpora, repeat):
+    """Measure the command line on all corpora at once."""
+    command = [sys.executable, "-m", "yamlfixer", "--nocache", "--nochange", "--recurse", "-1", directory]
+
+    def runcommand():
+        subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True, check=False)
+    paths = [path for paths in corpora.values() for path in paths]
+    return [result("commandline", paths, measure(repeat, runcommand))]
+
+
+def bench_startup(directory, corpora, repeat):
+    """Measure the command line's startup, for --version and for a small file read from stdin.
+
+    The interpreter's own startup is measured too, for comparison.
+    """
+    path = corpora["small"][0]
+    # The cached case uses its own cache, filled by the first run
+    environment = dict(os.environ, XDG_CACHE_HOME=os.path.join(directory, "cache"))
+
+    def runcommand(command):
+        with open(path, 'rb') as stdin:
+            subprocess.run([sys.executable, *command],
+                           stdin=stdin, capture_output=True, check=False, env=environment)
+    return [result(name, paths, measure(repeat, runcommand, command))
+            for (name, command, paths) in (("startup-interpreter", ["-c", "pass"], []),
+                                           ("startup-version", ["-m", "yamlfixer", "--version"], []),
+                                           ("startup-stdin", ["-m", "yamlfixer", "--nocache", "-"], [path]),
+                                           ("startup-stdin-cached", ["-m", "yamlfixer", "-"], [path]))]
+
+
+def overbudget(results):
+    """Return the time --version takes on top of the interpreter's startup if it exceeds STARTUPBUDGET, else None."""
+    seconds = {res["name"]: res["seconds"] for res in results}
+    if ("startup-version" not in seconds) or ("startup-interpreter" not in seconds):
+        return None
+    overhead = seconds["startup-version"] - seconds["startup-interpreter"]
+    return overhead if overhead > STARTUPBUDGET else None
+
+
+def main(argv=None):
+    """Generate the corpora, run the benchmarks and output their results."""
+    cmdline = argparse.ArgumentParser(prog="python -m benchmarks",
+                                      description="Run yamlfixer's benchmarks and output their results as JSON.")
+    cmdline.add_argument("-o", "--output",
+                         default="-",
+                         help="name of the file results will be written to. Defaults to `stdout`.")
+    cmdline.add_argument("-r", "--repeat",
+                         type=int,
+                         default=3,
+                         help="number of times each benchmark is run, the best time being kept. "
+                         "Default is `%(default)i`.")
+    cmdline.add_argument("-s", "--scale",
+                         type=int,
+                         default=1,
+                         help="sets the size of the synthetic corpora. Default is `%(default)i`.")
+    cmdline.add_argument("-b", "--benchmark",
+                         action="append",
+                         choices=BENCHMARKS,
+                         help="a benchmark to run, can be used several times. All benchmarks are run by default.")
+    arguments = cmdline.parse_args(argv)
+    selected = arguments.benchmark or BENCHMARKS
+    with tempfile.TemporaryDirectory(prefix="yamlfixer-benchmarks-") as directory:
+        corpora = generate(directory, arguments.scale)
+        results = []
+        if "fix" in selected:
+            results.extend(bench_fix(corpora, arguments.repeat))
+        if "scan" in selected:
+            results.extend(bench_scan(directory, corpora, arguments.repeat))
+        if "diff" in selected:
+            results.extend(bench_diff(corpora, arguments.repeat))
+        if "commandline" in selected:
+            results.extend(bench_commandline(directory, corpora, arguments.repeat))
+        if "startup" in selected:
+            results.extend(bench_startup(directory, corpora, arguments.repeat))
+    report = {"yamlfixer": __version__,
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+              "scale": arguments.scale,
+              "repeat": arguments.repeat,
+              "results": results}
+    output = json.dumps(report, indent=4)
+    if arguments.output == "-":
+        sys.stdout.write(f"{output}\n")
+    else:
+        with open(arguments.output, 'w', encoding='utf-8') as outputfile:
+            outputfile.write(f"{output}\n")
+    overhead = overbudget(results)
+    if overhead is not None:
+        sys.stderr.write(f"--version takes {overhead * 1000:.0f} ms more than the interpreter's startup, "
+                         f"over the budget of {STARTUPBUDGET * 1000:.0f} ms\n")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Synthetic YAML corpora generator."""
+
+import os
+import random
+
+# Functions returning a block of lines containing one problem each,
+# at least one per kind of problem handled by ProblemFixer
+PROBLEMS = {"trailing-spaces": lambda i: [f"key{i}: value{i}   "],
+            "truthy": lambda i: [f"key{i}: yes"],
+            "colons": lambda i: [f"key{i}:   value{i}"],
+            "commas": lambda i: [f"key{i}: [1 , 2,3]"],
+            "brackets": lambda i: [f"key{i}: [ 1, 2 ]"],
+            "braces": lambda i: [f"key{i}: {{  a: 1  }}"],
+            "comments": lambda i: [f"key{i}: value{i} #comment"],
+            "comments-indentation": lambda i: [f"key{i}:", "    # comment", f"  sub{i}: value"],
+            "empty-lines": lambda i: [f"key{i}: value{i}", "", "", "", ""],
+            "line-length": lambda i: [f"key{i}: {'x' * 100}"],
+            "indentation": lambda i: [f"key{i}:", f"  sub{i}:", f"      subsub{i}: value"],
+            "hyphens": lambda i: [f"key{i}:", "  -   item"],
+            "document-end": lambda i: [f"key{i}: value{i}", "---"],
+            "forbidden-document-markers": lambda i: [f"key{i}: value{i}", "...", "---"],
+            "syntax-tab": lambda i: [f"key{i}:", f"\tsub{i}: value"],
+            "syntax-colon": lambda i: [f"key{i}: value{i}", f"other{i}"],
+            "syntax-mapping": lambda i: [f"key{i}:", f"  sub{i}: 1", f"   other{i}: 2"]}
+
+# Functions adding one problem to a whole document, per kind of
+# problem handled by ProblemFixer which can't be found in a block
+DOCUMENTPROBLEMS = {"document-start": lambda text: text[len("---\n"):],
+                    "new-line-at-end-of-file": lambda text: text.rstrip("\n"),
+                    "new-lines": lambda text: text.replace("\n", "\r\n"),
+                    "new-lines-dos": lambda text: text}
+
+# yamllint's configuration data for the kinds of problems only found
+# with non-default values
+CONFIGS = {"document-end": "{extends: default, rules: {document-end: {present: true}}}",
+           "forbidden-document-markers": "{extends: default, rules: {document-start: {present: false}, "
+                                         "document-end: {present: false}}}",
+           "new-lines-dos": "{extends: default, rules: {new-lines: {type: dos}}}"}
+
+# Kinds of problems found in random blocks, which neither stop the
+# linter like syntax errors nor need a specific configuration
+RANDOMPROBLEMS = sorted(kind for kind in PROBLEMS if not kind.startswith("syntax-") and kind not in CONFIGS)
+
+# A block of lines without any problem
+CLEAN = ["key{i}:", "  name: value{i}", "  enabled: true", "  list:", "    - a", "    - b"]
+
+
+def cleanblock(index):
+    """Return a block of lines without any problem."""
+    return [line.format(i=index) for line in CLEAN]
+
+
+def document(nbblocks, problem=None, rng=None):
+    """Return a YAML document's contents.
+
+    If problem is set, each block of lines, or the whole document,
+    contains this kind of problem, else one block out of ten contains
+    a random kind of problem.
+    """
+    rng = rng or random.Random(0)
+    lines = ["---"]
+    for index in range(nbblocks):
+        if problem in PROBLEMS:
+            lines.extend(PROBLEMS[problem](index))
+        elif (problem is None) and not rng.randrange(10):
+            lines.extend(PROBLEMS[rng.choice(RANDOMPROBLEMS)](index))
+        else:
+            lines.extend(cleanblock(index))
+    text = '\n'.join(lines) + '\n'
+    return DOCUMENTPROBLEMS[problem](text) if problem in DOCUMENTPROBLEMS else text
+
+
+def configdata(path):
+    """Return the yamllint configuration data a generated file must be linted with."""
+    return CONFIGS.get(os.path.splitext(os.path.basename(path))[0], "default")
+
+
+def _write(path, yamltext):
+    """Write a YAML text to a file, creating directories as needed."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='') as yamlfile:
+        yamlfile.write(yamltext)
+
+
+def generate(directory, scale=1):
+    """Generate the synthetic corpora below a directory.
+
+    Returns a mapping of corpus names to lists of paths.
+    """
+    rng = random.Random(scale)
+    corpora = {"small": [], "huge": [], "dense": []}
+    # Many small files, in a tree of directories
+    for index in range(200 * scale):
+        path = os.path.join(directory, "small", f"dir{index % 10}", f"sub{index % 7}", f"file{index}.yml")
+        _write(path, document(rng.randint(1, 10), rng=rng))
+        corpora["small"].append(path)
+    # A few huge files
+    for index in range(2):
+        path = os.path.join(directory, "huge", f"huge{index}.yaml")
+        _write(path, document(2000 * scale, rng=rng))
+        corpora["huge"].append(path)
+    # One file dense in each kind of problem
+    for problem in sorted({**PROBLEMS, **DOCUMENTPROBLEMS}):
+        path = os.path.join(directory, "dense", f"{problem}.yml")
+        _write(path, document(100 * scale, problem=problem))
+        corpora["dense"].append(path)
+    return corpora
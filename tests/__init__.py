@@ -17,3 +17,12 @@
 #
 
 """Testsuite for yamlfixer."""
+
+
+def raised(function, *args, **kwargs):
+    """Call a function and return the exception it raised, or None."""
+    try:
+        function(*args, **kwargs)
+    except (Exception, SystemExit) as exc:  # pylint: disable=broad-except
+        return exc
+    return None
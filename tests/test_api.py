@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the Python API."""
+
+import unittest
+from unittest import mock
+
+from yamlfixer import api
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.api import fix_string, fix_many, FixResult
+
+from . import raised
+
+
+class APITestCase(unittest.TestCase):
+    """Tests the fix_string() and fix_many() functions."""
+
+    def test_fix_string(self):
+        """A document is fixed in memory."""
+        result = fix_string("a:   yes\n", config="{extends: default, rules: {document-start: disable}}")  # act
+
+        assert result == FixResult("fixed", "a: true\n", result.diff, 2, 2)
+        assert "+a: true\n" in result.diff
+
+    def test_fix_many(self):
+        """Worker processes give the same results."""
+        texts = ["---\na: 1\n", "b:   no\n", "c: [1,2]   \n"]
+
+        results = fix_many(texts, config="default", workers=2, maxpasses=2)  # act
+
+        assert results == fix_many(texts, config="default", maxpasses=2)
+        assert [result.status for result in results] == ["passed", "fixed", "fixed"]
+
+    def test_unknown_option(self):
+        """Unknown options are refused."""
+        error = raised(fix_string, "", unknown=True)  # act
+
+        assert isinstance(error, TypeError)
+
+    @mock.patch.dict(api.DEFAULTS, clear=True)
+    @mock.patch.object(api, "parse_commandline", wraps=parse_commandline)
+    def test_defaults_parsed_once(self, parser):
+        """The command line's defaults are only parsed once."""
+        results = [fix_string("---\na: 1\n", maxpasses=maxpasses) for maxpasses in (1, 2)]  # act
+
+        assert [result.status for result in results] == ["passed", "passed"]
+        assert parser.call_count == 1
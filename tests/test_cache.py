@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the cache of contents which passed the linter."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.cache import FixCache
+
+
+class FixCacheTestCase(unittest.TestCase):
+    """Tests the FixCache class."""
+
+    def setUp(self):
+        """Use a temporary cache directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.environ = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": self.tmpdir.name})
+        self.environ.start()
+
+    def tearDown(self):
+        """Remove the temporary cache directory."""
+        self.environ.stop()
+        self.tmpdir.cleanup()
+
+    def test_add_and_lookup(self):
+        """Added contents must be found, other contents must not."""
+        cache = FixCache(parse_commandline(["file.yml"]))
+
+        cache.add("---\nkey: value\n")  # act
+
+        assert "---\nkey: value\n" in cache
+        assert "---\nkey: other\n" not in cache
+
+    def test_configuration_changes(self):
+        """Entries must not be shared between yamllint configurations."""
+        cache = FixCache(parse_commandline(["-C", "relaxed", "file.yml"]))
+        cache.add("---\nkey: value\n")
+
+        othercache = FixCache(parse_commandline(["-C", "default", "file.yml"]))  # act
+
+        assert "---\nkey: value\n" not in othercache
+
+    def test_extended_configuration_changes(self):
+        """Entries must not be shared once a configuration extended by another one changes."""
+        basefile = os.path.join(self.tmpdir.name, "base.yml")
+        conffile = os.path.join(self.tmpdir.name, "conf.yml")
+        with open(basefile, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("extends: default\nrules:\n  line-length: disable\n")
+        with open(conffile, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write(f"---\nextends: {basefile}\n")
+        arguments = parse_commandline(["-c", conffile, "file.yml"])
+        FixCache(arguments).add("---\nkey: value\n")
+        with open(basefile, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("extends: default\n")
+
+        othercache = FixCache(arguments)  # act
+
+        assert "---\nkey: value\n" not in othercache
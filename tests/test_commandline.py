@@ -19,10 +19,16 @@
 """Tests invocation from the command line."""
 
 from io import StringIO
+import os
 import sys
+import glob
+import json
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 
-from yamlfixer.__main__ import run
+from yamlfixer.__main__ import run, parse_commandline
 
 
 class RunContext():
@@ -53,6 +59,13 @@ class RunContext():
         return self._raises_ctx.exception.code
 
 
+def jsonsummary(*options):
+    """Run the command line with --jsonsummary, and return its (exit code, summary) tuple."""
+    with mock.patch.object(sys, "stderr", new_callable=StringIO) as errstream:
+        returncode = run(("--jsonsummary", *options))
+    return (returncode, json.loads(errstream.getvalue()))
+
+
 class CommandLineTestCase(unittest.TestCase):
     """Test suite for the command line."""
 
@@ -66,7 +79,7 @@ class CommandLineTestCase(unittest.TestCase):
         """Tear down, empty for now."""
         super(CommandLineTestCase, cls).tearDownClass()
 
-    def test_run_with_bad_arguments(self):
+    def test_run_with_bad_arguments(self):  # pylint: disable=too-many-statements
         """Test launching yamlfixer with incorrect arguments."""
         with RunContext(self) as ctx:
             run(('--unknown-arg', ))
@@ -134,6 +147,16 @@ class CommandLineTestCase(unittest.TestCase):
             r'not allowed with argument -p\/--plainsummary$'
         )
 
+        with RunContext(self) as ctx:
+            run(('-j', '--jsonlines'))
+        assert ctx.returncode == 2
+        assert ctx.stdout == ''
+        self.assertRegex(
+            ctx.stderr.splitlines()[-1],
+            r'error: argument --jsonlines: '
+            r'not allowed with argument -j\/--jsonsummary$'
+        )
+
         with RunContext(self) as ctx:
             run(('-r', '3.5'))
         assert ctx.returncode == 2
@@ -151,3 +174,76 @@ class CommandLineTestCase(unittest.TestCase):
             ctx.stderr.splitlines()[-1],
             r'error: invalid tabsize value \'-3\'$'
         )
+
+        with RunContext(self) as ctx:
+            run(('--jobs', '-1'))
+        assert ctx.returncode == 2
+        assert ctx.stdout == ''
+        self.assertRegex(
+            ctx.stderr.splitlines()[-1],
+            r'error: invalid jobs value \'-1\'$'
+        )
+
+        with RunContext(self) as ctx:
+            run(('--linter', 'yamllint', '--backend', 'inprocess'))
+        assert ctx.returncode == 2
+        assert ctx.stdout == ''
+        self.assertRegex(
+            ctx.stderr.splitlines()[-1],
+            r'error: --linter can\'t be used with --backend inprocess$'
+        )
+
+        with RunContext(self) as ctx:
+            run(('--pipeline', '4', '--jobs', '2'))
+        assert ctx.returncode == 2
+        assert ctx.stdout == ''
+        self.assertRegex(
+            ctx.stderr.splitlines()[-1],
+            r'error: --pipeline can\'t be used with --jobs$'
+        )
+
+        with RunContext(self) as ctx:
+            run(('--serve', '-'))
+        assert ctx.returncode == 2
+        assert ctx.stdout == ''
+        self.assertRegex(
+            ctx.stderr.splitlines()[-1],
+            r'error: --serve\'s socket can\'t be `-`$'
+        )
+
+    @mock.patch.dict(os.environ, {"CI": "", "GITHUB_ACTIONS": "", "YAMLFIXER_SOCKET": "yamlfixer.sock"})
+    @mock.patch.object(sys, "argv", ["yamlfixer", "--serve"])
+    @mock.patch.object(sys, "stdin", StringIO())
+    def test_serve_with_redirected_stdin(self):
+        """Test that `-` isn't appended as --serve's socket when stdin is redirected."""
+        arguments = parse_commandline()  # act
+
+        assert arguments.serve == "yamlfixer.sock"
+
+    @mock.patch.object(sys, "stderr", new_callable=StringIO)
+    def test_run_with_jsonlines(self, errstream):
+        """Test the JSON records output for each file then for the summary."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        filename = os.path.join(tmpdir, "file.yml")
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("---\na: yes   \n")
+
+        returncode = run(('--nocache', '--jsonlines', filename))  # act
+
+        assert returncode == 0
+        records = [json.loads(line) for line in errstream.getvalue().splitlines()]
+        assert records == [{"filename": filename, "numericstatus": 2, "status": "FIXED", "issues": 2, "handled": 2},
+                           {"filestofix": 1, "passed": 0, "modified": 0, "fixed": 1, "skipped": 0,
+                            "notwritable": 0, "unknown": 0, "nochangemode": False}]
+
+    def test_run_with_jobs(self):
+        """Test that files fixed in parallel have the same results, in the same order, as when fixed sequentially."""
+        examples = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "examples", "*.yml")))
+
+        (sequential, parallel) = [jsonsummary("--nocache", "--nochange", *options, *examples)
+                                  for options in (("--jobs", "1"), ("--jobs", "2"))]  # act
+
+        assert parallel == sequential
+        assert list(parallel[1]["details"]) == examples
+        assert parallel[1]["filestofix"] == len(examples)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the ConfigResolver class."""
+
+import os
+import tempfile
+import unittest
+
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.configs import ConfigResolver
+
+
+class ConfigResolverTestCase(unittest.TestCase):
+    """Tests the per directory configurations."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmpdir.cleanup()
+
+    def test_nested(self):
+        """Each file uses the nearest configuration file, loaded only once."""
+        tmpdir = self.tmpdir.name
+        for directory in ("project/sub/subsub", "other"):
+            os.makedirs(os.path.join(tmpdir, directory))
+        configfile = os.path.join(tmpdir, "project", ".yamllint")
+        with open(configfile, 'w', encoding='utf-8') as config:
+            config.write("extends: default\nrules:\n  truthy: disable\n")
+        resolver = ConfigResolver(parse_commandline(["--nocache", "--nestedconfig", "x"]))
+        paths = [os.path.join(tmpdir, "project", "sub", "subsub", "a.yml"),
+                 os.path.join(tmpdir, "project", "b.yml"),
+                 os.path.join(tmpdir, "other", "c.yml")]
+
+        (linter, samelinter, otherlinter) = [resolver.resolve(path)[0] for path in paths]  # act
+
+        assert samelinter is linter
+        assert otherlinter is not linter
+        assert resolver.configfile(os.path.join(tmpdir, "project", "sub")) == configfile
+        assert linter.lint("---\na: yes\n") == (0, [])
+        assert otherlinter.lint("---\na: yes\n")[0] == 2
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the fixing of files."""
+
+import os
+import sys
+import difflib
+import tempfile
+import unittest
+from unittest import mock
+from io import StringIO
+
+from yamlfixer.constants import FIX_PASSEDLINTER, FIX_MODIFIED, FIX_FIXED
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.filefixer import FileFixer
+
+INDENTATIONCONFIG = "{extends: default, rules: {indentation: {spaces: 2}}}"
+BADINDENTATION = "---\na:\n    b: 1\n    c: 2\n    d: 3\n"
+
+
+class FileFixerTestCase(unittest.TestCase):
+    """Tests the FileFixer class."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmpdir.cleanup()
+
+    def fixcontents(self, yamltext, *options):
+        """Fix some contents in a temporary file, return (status, fixed contents)."""
+        filename = os.path.join(self.tmpdir.name, "file.yml")
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write(yamltext)
+        arguments = parse_commandline(["--nocache", *options, filename])
+        (status, _) = FileFixer(arguments, filename).fix()
+        with open(filename, 'r', encoding='utf-8') as yamlfile:
+            return (status, yamlfile.read())
+
+    def test_single_pass(self):
+        """A single pass only fixes the first faulty line in a block."""
+        (status, fixed) = self.fixcontents(BADINDENTATION, "-C", INDENTATIONCONFIG)  # act
+
+        assert status == FIX_MODIFIED
+        assert fixed == "---\na:\n  b: 1\n    c: 2\n    d: 3\n"
+
+    def test_several_passes(self):
+        """Several passes fix the whole block."""
+        (status, fixed) = self.fixcontents(BADINDENTATION, "-C", INDENTATIONCONFIG, "--maxpasses", "5")  # act
+
+        assert status == FIX_FIXED
+        assert fixed == "---\na:\n  b: 1\n  c: 2\n  d: 3\n"
+
+    def test_several_passes_issues(self):
+        """Issues are those of the original contents, however many passes fix them."""
+        filename = os.path.join(self.tmpdir.name, "file.yml")
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("---\nz: 1   \n" + BADINDENTATION[4:])
+        arguments = parse_commandline(["--nocache", "-C", INDENTATIONCONFIG, "--maxpasses", "5", filename])
+        filefixer = FileFixer(arguments, filename)
+
+        (status, _) = filefixer.fix()  # act
+
+        assert status == FIX_FIXED
+        assert (filefixer.issues, filefixer.issueshandled) == (2, 2)
+
+    @mock.patch.object(sys, "stdin", StringIO("# first\n---\na:  1\n---\nb: yes\n---\nc: [1,2]"))
+    @mock.patch.object(sys, "stdout", new_callable=StringIO)
+    def test_stream(self, outstream):
+        """Documents read from stdin are fixed and output one at a time."""
+        arguments = parse_commandline(["--nocache", "--stream", "-"])
+
+        (status, _) = FileFixer(arguments, "-").fix()  # act
+
+        assert status == FIX_FIXED
+        assert outstream.getvalue() == "# first\n---\na: 1\n---\nb: true\n---\nc: [1, 2]\n"
+
+    @mock.patch.object(sys, "stdin", StringIO("---\na: 1\n\n---\nb: 2\n"))
+    @mock.patch.object(sys, "stdout", new_callable=StringIO)
+    def test_stream_blank_lines(self, outstream):
+        """Blank lines between documents aren't blank lines at the end of a file."""
+        arguments = parse_commandline(["--nocache", "--stream", "-"])
+
+        (status, _) = FileFixer(arguments, "-").fix()  # act
+
+        assert status == FIX_PASSEDLINTER
+        assert outstream.getvalue() == "---\na: 1\n\n---\nb: 2\n"
+
+    def test_timings(self):
+        """Phases and fixers are timed with --timings."""
+        filename = os.path.join(self.tmpdir.name, "file.yml")
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("---\na: 1   \nb: 2   \n")
+        arguments = parse_commandline(["--nocache", "--timings", filename])
+        filefixer = FileFixer(arguments, filename)
+
+        filefixer.fix()  # act
+
+        timings = filefixer.timings.asdict()
+        assert timings["phases"]["lint"] > 0
+        assert timings["phases"]["relint"] > 0
+        assert timings["fixers"]["fix_trailingspaces"]["calls"] == 2
+
+    def test_trustfixers(self):
+        """Trusted fixes aren't linted again."""
+        filename = os.path.join(self.tmpdir.name, "file.yml")
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("---\na: yes   \n")
+        arguments = parse_commandline(["--nocache", "--timings", "--trustfixers", filename])
+        filefixer = FileFixer(arguments, filename)
+
+        (status, _) = filefixer.fix()  # act
+
+        assert status == FIX_FIXED
+        assert not filefixer.timings.phases["relint"]
+
+    def test_trustfixers_spacing(self):
+        """Fixes of spacing problems aren't trusted if their rules don't use the default values."""
+        filename = os.path.join(self.tmpdir.name, "file.yml")
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("---\na: [1,2]\n")
+        arguments = parse_commandline(["--nocache", "--timings", "--trustfixers",
+                                       "-C", "{extends: default, rules: {commas: {min-spaces-after: 2}}}", filename])
+        filefixer = FileFixer(arguments, filename)
+
+        (status, _) = filefixer.fix()  # act
+
+        assert status == FIX_MODIFIED
+        assert filefixer.timings.phases["relint"]
+
+    def test_diff(self):
+        """Diffs built from edits are the same as difflib's, and only computed when needed."""
+        filename = os.path.join(self.tmpdir.name, "file.yml")
+        original = "---\na: yes   \nb: 1\nc: 2\nd: 3\ne: 4\nf: 5\ng: 6\nh: 7\ni: 8\n"
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write(original)
+        difffile = os.path.join(self.tmpdir.name, "diff")
+        arguments = parse_commandline(["--nocache", "--nochange", "-D", difffile, filename])
+        filefixers = (FileFixer(arguments, filename),
+                      FileFixer(parse_commandline(["--nocache", "--nochange", filename]), filename))
+
+        ((_, differences), (_, nodifferences)) = [filefixer.fix() for filefixer in filefixers]  # act
+
+        assert differences[1:] == list(difflib.unified_diff(original.splitlines(keepends=True),
+                                                            filefixers[0].outcontents.splitlines(keepends=True),
+                                                            fromfile=f'"{filename}"',
+                                                            tofile=f'"{filename}-after"'))
+        assert not nodifferences
+
+    def test_atomic(self):
+        """Atomic writes keep permissions and backups."""
+        filename = os.path.join(self.tmpdir.name, "file.yml")
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("---\na: yes   \n")
+        os.chmod(filename, 0o640)
+        arguments = parse_commandline(["--nocache", "--atomic", "--fsync", "directory", "--backup", filename])
+        filefixer = FileFixer(arguments, filename)
+
+        (status, _) = filefixer.fix()  # act
+
+        assert status == FIX_FIXED
+        assert (os.stat(filename).st_mode & 0o777) == 0o640
+        assert filefixer.writtendir == os.path.realpath(self.tmpdir.name)
+        with open(f"{filename}.orig", encoding='utf-8') as yamlfile:
+            assert yamlfile.read() == "---\na: yes   \n"
+        assert sorted(os.listdir(self.tmpdir.name)) == ["file.yml", "file.yml.orig"]
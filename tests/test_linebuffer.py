@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the line edition buffer."""
+
+import unittest
+
+from yamlfixer.linebuffer import LineBuffer
+
+from . import raised
+
+
+def edit(lines):
+    """Edit lines the way fixers do, always using their original line numbers."""
+    lines.insert(0, "---")
+    lines[1] = "B"
+    del lines[2:4]
+    lines.insert(4, "# before c")
+    lines[4] = lines[4].upper()
+    del lines[5]
+    lines.insert(len(lines), "...")
+
+
+class LineBufferTestCase(unittest.TestCase):
+    """Tests the LineBuffer class."""
+
+    def test_original_coordinates(self):
+        """Edits are addressed using original line numbers."""
+        lines = LineBuffer(["a", "b", "", "", "c", "d"])
+
+        edit(lines)  # act
+
+        assert lines.materialize() == ["---", "a", "B", "# before c", "C", "..."]
+        assert len(lines) == 6
+        assert lines[2] == ""
+
+    def test_out_of_range(self):
+        """Out of range lines raise IndexError, like lists do."""
+        lines = LineBuffer(["a"])
+
+        error = raised(lines.__setitem__, 1, "b")  # act
+
+        assert isinstance(error, IndexError)
+        assert lines[-1] == "a"
+
+    def test_opcodes(self):
+        """Edits are turned into difflib's opcodes."""
+        lines = LineBuffer(["a", "b", "c", "d", "e"])
+        lines[1] = "B"
+        lines.insert(2, "b2")
+        del lines[4]
+
+        opcodes = lines.opcodes()  # act
+
+        assert opcodes == [("equal", 0, 1, 0, 1),
+                           ("replace", 1, 2, 1, 3),
+                           ("equal", 2, 4, 3, 5),
+                           ("delete", 4, 5, 5, 5)]
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the linting backends."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.constants import FIX_FIXED
+from yamlfixer.filefixer import fixfile
+from yamlfixer.linter import InProcessLinter, SubprocessLinter
+from yamlfixer.yamlfixer import fixfiles
+
+from . import raised
+
+BADCONTENT = "key:  value   \nother: yes\n\n\n\nlist: [1,2]"
+
+
+class LinterTestCase(unittest.TestCase):
+    """Tests the in-process and subprocess linting backends."""
+
+    def test_backends_agree(self):
+        """Both backends must report the same problems."""
+        arguments = parse_commandline(["-C", "relaxed", "file.yml"])
+        inprocess = InProcessLinter(arguments)
+        outofprocess = SubprocessLinter(arguments)
+
+        ((inexitcode, inproblems), (outexitcode, outproblems)) = [linter.lint(BADCONTENT)
+                                                                  for linter in (inprocess, outofprocess)]  # act
+
+        assert inexitcode == outexitcode
+        assert inproblems == outproblems
+        assert (1, 12, "error", "trailing spaces (trailing-spaces)") in inproblems
+
+    def test_clean_content(self):
+        """Clean contents must produce no problem."""
+        arguments = parse_commandline(["file.yml"])
+
+        result = InProcessLinter(arguments).lint("---\nkey: value\n")  # act
+
+        assert result == (0, [])
+
+    def test_lintfiles(self):
+        """Files linted together have the same problems as when linted alone."""
+        arguments = parse_commandline(["-C", "relaxed", "file.yml"])
+        linter = SubprocessLinter(arguments)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filenames = [os.path.join(tmpdir, name) for name in ("bad:file.yml", "good.yml")]
+            for (filename, content) in zip(filenames, (BADCONTENT, "---\nkey: value\n")):
+                with open(filename, 'w', encoding='utf-8') as yamlfile:
+                    yamlfile.write(content)
+
+            results = linter.lintfiles(filenames)  # act
+
+        assert results == {filenames[0]: linter.lint(BADCONTENT), filenames[1]: (0, [])}
+
+    def test_lintfiles_with_ignores(self):
+        """Files are fixed the same way together or alone when some are ignored by a rule."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        filenames = [os.path.join(tmpdir, name) for name in ("ignored.yml", "other.yml")]
+        for filename in filenames:
+            with open(filename, 'w', encoding='utf-8') as yamlfile:
+                yamlfile.write("---\nkey: yes\n")
+        arguments = parse_commandline(["--nocache", "--nochange", "--backend", "subprocess", "--batchsize", "2",
+                                       "-C", "{extends: default, rules: {truthy: {ignore: [ignored.yml]}}}",
+                                       *filenames])
+        linter = SubprocessLinter(arguments)
+
+        results = fixfiles(arguments, linter, None, filenames)  # act
+
+        assert linter.lintfiles(filenames) is None
+        assert results == [fixfile(arguments, linter, None, filename) for filename in filenames]
+        assert [status for (status, *_) in results] == [FIX_FIXED, FIX_FIXED]
+
+    def test_linter_path(self):
+        """The linting command is found once and launched without any shell."""
+        arguments = parse_commandline(["--linter", "yamllint", "-C", "relaxed", "file.yml"])
+
+        linter = SubprocessLinter(arguments)  # act
+
+        assert linter.argv == [shutil.which("yamllint"), "--format", "parsable", "--strict",
+                               "--config-data", "relaxed", "-"]
+        assert linter.lint("---\nkey: value\n") == (0, [])
+
+    def test_missing_linter(self):
+        """A linting command which can't be found exits at once."""
+        arguments = parse_commandline(["--linter", "/nonexistent/yamllint", "file.yml"])
+
+        error = raised(SubprocessLinter, arguments)  # act
+
+        assert isinstance(error, SystemExit)
+        assert error.code == -2
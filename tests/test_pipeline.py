@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the Pipeline class."""
+
+import os
+import tempfile
+import unittest
+
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.linter import getlinter
+from yamlfixer.filefixer import fixfile
+from yamlfixer.pipeline import Pipeline
+
+CONTENTS = ("---\na: yes   \n", "---\nb: 1\n", "c: [1,2]\n", "---\nd:\n  - e\n   - f\n")
+
+
+class PipelineTestCase(unittest.TestCase):
+    """Tests the asynchronous pipeline."""
+
+    def test_ordered_results(self):
+        """Results are the same as without the pipeline, in the same order."""
+        for backend in ("inprocess", "subprocess"):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                filenames = [os.path.join(tmpdir, f"file{index}.yml") for index in range(20)]
+                for (index, filename) in enumerate(filenames):
+                    with open(filename, 'w', encoding='utf-8') as yamlfile:
+                        yamlfile.write(CONTENTS[index % len(CONTENTS)])
+                arguments = parse_commandline(["--nocache", "--nochange", "--backend", backend, "-C", "default",
+                                               "--pipeline", "3", *filenames])
+                linter = getlinter(arguments)
+                pipeline = Pipeline(arguments, linter, None)
+
+                results = list(pipeline.results(filenames))  # act
+
+                assert results == [(filename, fixfile(arguments, linter, None, filename)) for filename in filenames]
+            assert [issues for (_, (_, _, issues, *_)) in results[:3]] == [2, 0, 2]
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the PreScanner class."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.constants import FIX_FIXED
+from yamlfixer.cache import FixCache
+from yamlfixer.filefixer import FileFixer
+from yamlfixer.linter import InProcessLinter
+from yamlfixer.prescanner import PreScanner
+
+TEXTUAL = "\n\n# comment  \nkey: value  \n\n\n\nother: [1, 2]\n\n\nlast: 1"
+
+
+class PreScannerTestCase(unittest.TestCase):
+    """Tests the textual problems found without the linter."""
+
+    def test_same_problems(self):
+        """Problems are the same as the linter's ones."""
+        for confdata in ("default", "{extends: default, rules: {empty-lines: {max-start: 1, max-end: 0}}}"):
+            linter = InProcessLinter(parse_commandline(["-C", confdata, "file.yml"]))
+
+            problems = PreScanner(linter.enabledrules()).problems(TEXTUAL)  # act
+
+            assert problems == linter.lint(TEXTUAL)[1]
+
+    def test_disabled_rules(self):
+        """Only the problems of enabled rules are found."""
+        linter = InProcessLinter(parse_commandline(["-C", "{rules: {trailing-spaces: enable}}", "file.yml"]))
+
+        problems = PreScanner(linter.enabledrules()).problems(TEXTUAL)  # act
+
+        assert [msg for (_, _, _, msg) in problems] == ["trailing spaces (trailing-spaces)"] * 2
+        assert PreScanner(linter.enabledrules()).problems(f"{TEXTUAL}\n# yamllint disable-line\n") == []
+
+    def test_cached_prescan(self):
+        """Prescanned contents already in the cache aren't linted."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": tmpdir}):
+            arguments = parse_commandline(["--prescan", "--nochange", "-C", "default", "file.yml"])
+            cache = FixCache(arguments)
+        cache.add("---\nkey: value\n")
+        filefixer = FileFixer(arguments, "<string>", cache=cache)
+        filefixer.incontents = "key: value   "
+        filefixer.linter.lint = mock.Mock()
+
+        (status, _) = filefixer.fixcontents()  # act
+
+        filefixer.linter.lint.assert_not_called()
+        assert status == FIX_FIXED
+        assert filefixer.outcontents == "---\nkey: value\n"
+        assert (filefixer.issues, filefixer.issueshandled) == (3, 3)
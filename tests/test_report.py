@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the problems reports."""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+
+from yamlfixer.__main__ import run, parse_commandline
+from yamlfixer.constants import FIX_SKIPPED
+from yamlfixer.filefixer import FileFixer
+from yamlfixer.report import SarifReport, reportentry
+
+
+class ReportTestCase(unittest.TestCase):
+    """Tests the report's entries and formats."""
+
+    def test_entries(self):
+        """Each problem is reported with its outcome."""
+        arguments = parse_commandline(["--nocache", "--nochange", "-C", "default", "--report", "report.sarif", "x"])
+        filefixer = FileFixer(arguments, "<string>")
+        filefixer.incontents = "---\na:   yes\n  b: 1\n"
+
+        filefixer.fixcontents()  # act
+
+        outcomes = [(entry["rule"], entry["outcome"]) for entry in filefixer.report]
+        assert outcomes == [("syntax", "handled"), ("colons", "remaining"), ("truthy", "remaining")]
+        assert filefixer.report[0]["pass"] == 1
+
+    def test_unchanged(self):
+        """Problems of contents which nothing could change remain."""
+        arguments = parse_commandline(["--nocache", "--nochange", "-C", "default", "--report", "report.sarif", "x"])
+        filefixer = FileFixer(arguments, "<string>")
+        filefixer.incontents = "---\nkey: value\nkey: other\n"
+
+        (status, _) = filefixer.fixcontents()  # act
+
+        outcomes = [(entry["rule"], entry["outcome"]) for entry in filefixer.report]
+        assert status == FIX_SKIPPED
+        assert outcomes == [("key-duplicates", "unhandled"), ("key-duplicates", "remaining")]
+
+    def test_unchanged_several_passes(self):
+        """Problems of contents which nothing could change remain once, however many passes run."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        (filename, reportname) = (os.path.join(tmpdir, "file.yml"), os.path.join(tmpdir, "report.sarif"))
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("---\nkey: value\nkey: other\n")
+
+        run(("--nocache", "-C", "default", "--maxpasses", "2", "--report", reportname, filename))  # act
+
+        with open(reportname, 'r', encoding='utf-8') as reportfile:
+            results = json.load(reportfile)["runs"][0]["results"]
+        assert [(result["ruleId"], result["properties"]["outcome"]) for result in results] \
+            == [("key-duplicates", "unhandled"), ("key-duplicates", "remaining")]
+
+    def test_sarif(self):
+        """SARIF reports are written one result at a time."""
+        reportfile = StringIO()
+        report = SarifReport(reportfile)
+        report.add("a.yml", [reportentry((2, 7, "error", "trailing spaces (trailing-spaces)"), "handled", 1),
+                             reportentry((3, 1, "warning", "missing document start \"---\" (document-start)"),
+                                         "remaining")])
+        report.add("b.yml", [])
+
+        report.close()  # act
+
+        run = json.loads(reportfile.getvalue())["runs"][0]
+        assert [(result["ruleId"], result["kind"], result["level"]) for result in run["results"]] \
+            == [("trailing-spaces", "pass", "none"), ("document-start", "fail", "warning")]
+        assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == ["document-start", "trailing-spaces"]
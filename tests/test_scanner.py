@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the scanning of directories."""
+
+import os
+import subprocess
+import tempfile
+import unittest
+
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.scanner import Scanner
+
+TREE = {".gitignore": "vendor/\n*.generated.yml\n",
+        "a.yml": "",
+        "b/c.yaml": "",
+        "b/d.generated.yml": "",
+        "b/e/f.yml": "",
+        "b/notyaml.txt": "",
+        "g.yml": "",
+        "vendor/h.yml": "",
+        ".git/i.yml": ""}
+
+
+class ScannerTestCase(unittest.TestCase):
+    """Tests the Scanner class."""
+
+    def setUp(self):
+        """Create a temporary directory tree."""
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        for (relpath, text) in TREE.items():
+            path = os.path.join(self.tmpdir.name, relpath)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as treefile:
+                treefile.write(text)
+
+    def tearDown(self):
+        """Remove the temporary directory tree."""
+        self.tmpdir.cleanup()
+
+    def scan(self, *options):
+        """Return the relative paths found by a scanner."""
+        scanner = Scanner(parse_commandline([*options, "--nocache", self.tmpdir.name]))
+        return [os.path.relpath(path, self.tmpdir.name) for path in scanner.scan(self.tmpdir.name)]
+
+    def test_ignore_rules(self):
+        """.gitignore files are honoured and .git is pruned."""
+        found = self.scan("-r", "-1", "--jobs", "3")  # act
+
+        assert found == ["a.yml", "b/c.yaml", "b/e/f.yml", "g.yml"]
+
+    def test_paths_order(self):
+        """Files are found in the order of their sorted paths."""
+        for relpath in ("b-c.yml", "b0.yml"):
+            with open(os.path.join(self.tmpdir.name, relpath), 'w', encoding='utf-8'):
+                pass
+
+        found = self.scan("-r", "-1")  # act
+
+        assert found == sorted(found)
+        assert found == ["a.yml", "b-c.yml", "b/c.yaml", "b/e/f.yml", "b0.yml", "g.yml"]
+
+    def test_no_ignore_rules(self):
+        """--noignore and --exclude."""
+        found = self.scan("-r", "-1", "--noignore", "-x", "b")  # act
+
+        assert found == [".git/i.yml", "a.yml", "g.yml", "vendor/h.yml"]
+
+    def test_recursion_level(self):
+        """The recursion level is honoured."""
+        found = self.scan("-r", "1")  # act
+
+        assert found == ["a.yml", "b/c.yaml", "g.yml"]
+
+    def test_staged(self):
+        """--staged only generates files staged in git."""
+        git = ["git", "-C", self.tmpdir.name]
+        subprocess.run([*git, "init", "-q"], check=True)
+        subprocess.run([*git, "add", "a.yml", "b/e/f.yml", "b/notyaml.txt"], check=True)
+        olddir = os.getcwd()
+        os.chdir(self.tmpdir.name)
+        try:
+            scanner = Scanner(parse_commandline(["--nocache", "--staged"]))
+
+            found = list(scanner.changed(["b"]))  # act
+            allfound = list(scanner.changed([]))
+        finally:
+            os.chdir(olddir)
+
+        assert found == []  # Not recursive by default
+        assert allfound == ["a.yml", "b/e/f.yml"]
+
+    def test_accepts(self):
+        """Single files are accepted the same way they are scanned."""
+        root = self.tmpdir.name
+        scanner = Scanner(parse_commandline(["--nocache", "-r", "1", root]))
+
+        accepted = sorted(relpath for relpath in TREE if scanner.accepts(root, os.path.join(root, relpath)))  # act
+
+        assert accepted == ["a.yml", "b/c.yaml", "g.yml"]
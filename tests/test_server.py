@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the server mode."""
+
+import os
+import time
+import tempfile
+import threading
+import unittest
+
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.client import FixClient
+from yamlfixer.server import FixServer
+
+
+@unittest.skipUnless(hasattr(os, "getuid"), "Unix sockets are needed")
+class ServerTestCase(unittest.TestCase):
+    """Tests the FixServer and FixClient classes."""
+
+    options = ("--nocache",)
+
+    def setUp(self):
+        """Start a server in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.socket = os.path.join(self.tmpdir.name, "yamlfixer.sock")
+        server = FixServer(parse_commandline([*self.options, "--serve", self.socket]))
+        self.thread = threading.Thread(target=server.serve)
+        self.thread.start()
+        while not os.path.exists(self.socket):
+            time.sleep(0.01)
+        arguments = parse_commandline(["--nocache"])
+        arguments.socket = self.socket
+        arguments.shutdown = False
+        self.client = FixClient(arguments)
+        self.client.connect()
+
+    def tearDown(self):
+        """Stop the server and remove the temporary directory."""
+        self.client.request({"command": "shutdown"})
+        self.client.close()
+        self.thread.join()
+        self.tmpdir.cleanup()
+
+    def test_content(self):
+        """Contents are fixed and sent back."""
+        response = self.client.request({"content": "a:   yes\n"})  # act
+
+        assert response["status"] == "fixed"
+        assert response["content"] == "---\na: true\n"
+        assert response["handled"] == 3
+
+    def test_path(self):
+        """Files are fixed in place."""
+        filename = os.path.join(self.tmpdir.name, "file.yml")
+        with open(filename, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write("---\na: 1   \n")
+
+        response = self.client.request({"path": filename})  # act
+
+        assert response["status"] == "fixed"
+        with open(filename, 'r', encoding='utf-8') as yamlfile:
+            assert yamlfile.read() == "---\na: 1\n"
+
+    def test_invalid(self):
+        """Invalid requests get an error."""
+        response = self.client.request({"command": "unknown"})  # act
+
+        assert "error" in response
+
+    def test_failure(self):
+        """Requests which can't be fixed get an error, and the connection goes on."""
+        response = self.client.request({"path": os.path.join(self.tmpdir.name, "file\0.yml")})  # act
+
+        assert "error" in response
+        assert self.client.request({"content": "---\na: 1\n"})["status"] == "passed"
+
+
+class NestedConfigServerTestCase(ServerTestCase):
+    """Tests the FixServer class with --nestedconfig."""
+
+    options = ("--nocache", "--nestedconfig")
+
+    def test_content_configuration(self):
+        """Contents are fixed with the configuration found from their path."""
+        with open(os.path.join(self.tmpdir.name, ".yamllint"), 'w', encoding='utf-8') as configfile:
+            configfile.write("{extends: default, rules: {truthy: disable}}\n")
+
+        response = self.client.request({"content": "---\na: yes\n",
+                                        "path": os.path.join(self.tmpdir.name, "file.yml")})  # act
+
+        assert response["status"] == "passed"
+        assert response["content"] == "---\na: yes\n"
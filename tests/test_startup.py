@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the command line's startup."""
+
+import os
+import sys
+import tempfile
+import unittest
+import subprocess
+
+# Directory containing the yamlfixer package
+TOPDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only needed by options which are not used here
+HEAVYMODULES = ("argparse", "asyncio", "concurrent.futures", "difflib", "json", "multiprocessing",
+                "pathspec", "subprocess", "tempfile", "yamlfixer.problemfixer", "yamllint.linter")
+
+# Runs yamlfixer then outputs the names of the imported modules
+LISTMODULES = "import sys; from yamlfixer.__main__ import run; run(sys.argv[1:]); print(*sys.modules)"
+
+
+def startup(command, stdin=None, environment=None):
+    """Run a Python command and return its standard output."""
+    process = subprocess.run([sys.executable, *command], cwd=TOPDIR, input=stdin, capture_output=True,
+                             check=True, text=True, env=environment)
+    return process.stdout
+
+
+class StartupTestCase(unittest.TestCase):
+    """Tests that the command line only imports what it needs."""
+
+    def test_version(self):
+        """--version neither parses the command line nor imports the fixing modules."""
+        output = startup(["-c", LISTMODULES, "--version"])  # act
+
+        (version, modules) = output.splitlines()
+        assert version.startswith("yamlfixer v")
+        assert not {"yamlfixer.yamlfixer", *HEAVYMODULES} & set(modules.split())
+
+    def test_cached_stdin(self):
+        """Contents read from stdin and found in the cache don't need any heavy module."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            environment = dict(os.environ, XDG_CACHE_HOME=tmpdir)
+            startup(["-m", "yamlfixer", "-"], "---\nkey: value\n", environment)
+
+            output = startup(["-c", LISTMODULES, "-"], "---\nkey: value\n", environment)  # act
+
+        modules = set(output.splitlines()[-1].split())
+        assert "yamlfixer.yamlfixer" in modules
+        assert not (set(HEAVYMODULES) - {"argparse"}) & modules
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Tests the watching of files."""
+
+import os
+import tempfile
+import unittest
+
+from yamlfixer.__main__ import parse_commandline
+from yamlfixer.yamlfixer import YAMLFixer
+from yamlfixer.watcher import Watcher, PollingBackend
+
+
+class WatcherTestCase(unittest.TestCase):
+    """Tests the Watcher class."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmpdir.cleanup()
+
+    def write(self, relpath, text):
+        """Write a file in the temporary directory and return its path."""
+        path = os.path.join(self.tmpdir.name, relpath)
+        with open(path, 'w', encoding='utf-8') as yamlfile:
+            yamlfile.write(text)
+        return path
+
+    def test_changes(self):
+        """Only files changed by others are fixed again."""
+        fixed = self.write("fixed.yml", "a: yes\n")
+        unchanged = self.write("unchanged.yml", "---\nb: 1\n")
+        watcher = Watcher(YAMLFixer(parse_commandline(["--nocache", "--watch", self.tmpdir.name])))
+        watcher.backend = PollingBackend()
+        watcher._watch(self.tmpdir.name)  # pylint: disable=protected-access
+        watcher._fix()  # pylint: disable=protected-access
+        created = self.write("created.yml", "c: on\n")
+        self.write("notyaml.txt", "")
+
+        tofix = watcher._tofix(watcher.backend.changes(0))  # act  # pylint: disable=protected-access
+
+        assert tofix == [created]
+        with open(fixed, 'r', encoding='utf-8') as yamlfile:
+            assert yamlfile.read() == "---\na: true\n"
+        assert unchanged not in tofix
@@ -20,10 +20,10 @@
 
 import sys
 import os
-import argparse
 
 from . import __version__, __copyright__
-from .yamlfixer import YAMLFixer
+from .constants import EXIT_OK
+from .common import defaultsocket
 
 GPLBLURB = """
 This program is free software: you can redistribute it and/or modify
@@ -41,9 +41,11 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
-def parse_commandline(argv=None):
-    """Parse the command line and return the parsed arguments."""
-    # Ensure we read from stdin in case it's redirected
+def appendstdin():
+    """Append `-` to the command line if stdin is redirected, to ensure we read from it."""
+    # Servers and watchers never read stdin
+    if any(arg.split("=", 1)[0] in ("--serve", "--watch") for arg in sys.argv[1:]):
+        return
     # We add some additional checks because GitHub actions don't
     # provide a TTY
     if ("-" not in sys.argv[1:]) \
@@ -52,6 +54,13 @@ def parse_commandline(argv=None):
        and not os.environ.get("CI"):
         sys.argv.append("-")
 
+
+def parse_commandline(argv=None):  # pylint: disable=too-many-statements,too-many-branches
+    """Parse the command line and return the parsed arguments."""
+    import argparse  # pylint: disable=import-outside-toplevel
+    if argv is None:
+        appendstdin()
+
     # Parse the command line arguments
     cmdline = argparse.ArgumentParser(description="Fix formatting problems in YAML documents. "
                                       "If no file is specified, then reads input from `stdin`.",
@@ -69,6 +78,22 @@ def parse_commandline(argv=None):
     cmdline.add_argument("-B", "--backupsuffix",
                          default=".orig",
                          help="sets the suffix for backup files, `%(default)s` is the default.")
+    cmdline.add_argument("--atomic",
+                         action="store_true",
+                         help="write modified files atomically, by renaming a new file over the "
+                         "original one, keeping its permissions and ownership.")
+    cmdline.add_argument("--backend",
+                         choices=("auto", "inprocess", "subprocess"),
+                         default="auto",
+                         help="sets how yamllint is launched, either imported in-process "
+                         "or as an external command. Defaults to `%(default)s`, which "
+                         "uses the in-process backend if yamllint can be imported.")
+    cmdline.add_argument("--batchsize",
+                         metavar="N",
+                         type=int,
+                         default=1,
+                         help="sets the maximum number of files linted by a single call to the external "
+                         "yamllint command with the subprocess backend. Default is `%(default)i`.")
     cmdline.add_argument("-d", "--debug",
                          action="store_true",
                          help="output debug information to stderr.")
@@ -81,21 +106,84 @@ def parse_commandline(argv=None):
                          default="yaml,yml,yamllint",
                          help="comma separated list of acceptable extensions when searching "
                          "directories for YAML files. Defaults to `%(default)s`.")
+    cmdline.add_argument("-x", "--exclude",
+                         metavar="GLOB",
+                         action="append",
+                         help="excludes files and directories whose path or name matches "
+                         "this glob pattern when searching directories. Can be used several times.")
     cmdline.add_argument("-f", "--forcecolors",
                          action="store_true",
                          help="force colorized output even if stream is not a TTY.")
     cmdline.add_argument("-F", "--followsymlinks",
                          action="store_true",
                          help="follow symbolic links when recursing directories.")
+    cmdline.add_argument("--fsync",
+                         choices=("none", "file", "directory", "end"),
+                         default="none",
+                         help="sets when modified files are flushed to disk : `file` flushes each file "
+                         "and, with --atomic, its directory, `directory` flushes each file but each "
+                         "directory only once at the end, and `end` flushes everything at once at the end. "
+                         "Defaults to `%(default)s`, leaving it to the operating system.")
+    cmdline.add_argument("--jobs",
+                         metavar="N",
+                         type=int,
+                         default=1,
+                         help="sets the number of worker processes fixing files in parallel. "
+                         "Default is `%(default)i`, and `0` means one per CPU.")
+    cmdline.add_argument("--linter",
+                         metavar="LINTER_PATH",
+                         default=None,
+                         help="path to the yamllint command, which implies the subprocess backend "
+                         "unless --backend is used. Defaults to the `yamllint` found in the `PATH`.")
     cmdline.add_argument("-l", "--listfixers",
                          action="store_true",
                          help="output the list of available fixers.")
+    cmdline.add_argument("--maxpasses",
+                         metavar="N",
+                         type=int,
+                         default=1,
+                         help="sets the maximum number of lint and fix passes on each file, "
+                         "passes stop as soon as problems don't change anymore or grow in number. "
+                         "Default is `%(default)i`.")
+    cmdline.add_argument("--nocache",
+                         action="store_true",
+                         help="don't use the cache of contents which already passed the linter.")
+    cmdline.add_argument("--noignore",
+                         action="store_true",
+                         help="don't honour `.gitignore` files and yamllint's `ignore` patterns "
+                         "when searching directories.")
     cmdline.add_argument("-N", "--nosyntax",
                          action="store_true",
                          help="don't try to fix syntax errors.")
     mutuallyexclusive.add_argument("-n", "--nochange",
                                    action="store_true",
                                    help="don't modify anything.")
+    cmdline.add_argument("--pipeline",
+                         metavar="N",
+                         type=int,
+                         default=0,
+                         help="fix files through an asynchronous pipeline whose reading, linting and "
+                         "fixing stages each process up to N files at once. Default is `%(default)i`, "
+                         "meaning no pipeline.")
+    cmdline.add_argument("--prescan",
+                         action="store_true",
+                         help="fix trailing spaces, too many blank lines, missing document start and "
+                         "missing newline at end of file without the linter, as allowed by yamllint's "
+                         "configuration, and don't lint at all if the new contents are in the cache.")
+    cmdline.add_argument("--profile",
+                         metavar="PROFILE_FILE",
+                         default=None,
+                         help="profile the main process with cProfile and save the "
+                         "statistics to this file, for use with the `pstats` module.")
+    cmdline.add_argument("--report",
+                         metavar="REPORT_FILE",
+                         default=None,
+                         help="name of the file a report of each problem found, and whether "
+                         "it was fixed or not, will be written to.")
+    cmdline.add_argument("--reportformat",
+                         choices=("sarif", "jsonlines"),
+                         default="sarif",
+                         help="sets the format of the --report file. Defaults to `%(default)s`.")
     cmdline.add_argument("-r", "--recurse",
                          metavar="LEVEL",
                          type=int,
@@ -107,6 +195,10 @@ def parse_commandline(argv=None):
     mutuallyexclusive.add_argument("-j", "--jsonsummary",
                                    action="store_true",
                                    help="output JSON summary to stderr.")
+    mutuallyexclusive.add_argument("--jsonlines",
+                                   action="store_true",
+                                   help="output a JSON record to stderr for each file as soon as it is fixed, "
+                                   "then a JSON record for the whole summary, each on its own line.")
     mutuallyexclusive.add_argument("-p", "--plainsummary",
                                    action="store_true",
                                    help="output plain text summary to stderr.")
@@ -115,12 +207,49 @@ def parse_commandline(argv=None):
                                    help="output colorized plain text summary to stderr. "
                                    "If stderr is not a TTY output is identical to --plainsummary "
                                    "unless --forcecolors is also used.")
+    cmdline.add_argument("--serve",
+                         metavar="SOCKET",
+                         nargs="?",
+                         const="",
+                         default=None,
+                         help="don't fix any file, but run as a server fixing the files or contents "
+                         "sent by `yamlfixer-client` through this Unix socket, by default "
+                         "`$YAMLFIXER_SOCKET`, else `yamlfixer.sock` in `$XDG_RUNTIME_DIR` or in the "
+                         "temporary directory.")
+    cmdline.add_argument("--stream",
+                         action="store_true",
+                         help="when reading from `stdin`, fix and output each YAML document "
+                         "as soon as it is read, instead of reading the whole input first.")
+    cmdline.add_argument("--timings",
+                         action="store_true",
+                         help="measure the time spent in each processing phase and each fixer, "
+                         "and add it to the summary.")
+    cmdline.add_argument("--trustfixers",
+                         action="store_true",
+                         help="don't lint fixed contents again when all problems were handled by fixers "
+                         "which can't introduce new problems, and consider them as entirely fixed.")
+    cmdline.add_argument("--watch",
+                         action="store_true",
+                         help="once all files are fixed, keep fixing them each time they are created "
+                         "or modified, until interrupted.")
     cmdline.add_argument("-t", "--tabsize",
                          type=int,
                          default=2,
                          help="sets the number of spaces to replace tabs "
                          "with, default is `%(default)i`.")
     mutuallyexclusive = cmdline.add_mutually_exclusive_group()
+    mutuallyexclusive.add_argument("--changedsince",
+                                   metavar="REF",
+                                   default=None,
+                                   help="only fix the files which differ from git revision REF, "
+                                   "or which are untracked, within the specified files and directories, "
+                                   "or within the current directory if none is specified.")
+    mutuallyexclusive.add_argument("--staged",
+                                   action="store_true",
+                                   help="only fix the files which are staged in git, "
+                                   "within the specified files and directories, "
+                                   "or within the current directory if none is specified.")
+    mutuallyexclusive = cmdline.add_mutually_exclusive_group()
     mutuallyexclusive.add_argument("-c", "--config-file",
                                    metavar="CONFIG_FILE",
                                    default=None,
@@ -129,6 +258,10 @@ def parse_commandline(argv=None):
                                    metavar="CONFIG_DATA",
                                    default=None,
                                    help="custom configuration for yamllint as YAML source, none by default.")
+    mutuallyexclusive.add_argument("--nestedconfig",
+                                   action="store_true",
+                                   help="lint each file with the yamllint configuration file found in its own "
+                                   "directory or its parents, instead of the current directory.")
     cmdline.add_argument("filenames",
                          nargs="*",
                          metavar="FILE_or_DIR",
@@ -139,15 +272,56 @@ def parse_commandline(argv=None):
     arguments = cmdline.parse_args(argv)
     if arguments.tabsize < 1:
         cmdline.error(f"invalid tabsize value '{arguments.tabsize}'")
+    if arguments.staged or arguments.changedsince or arguments.watch:
+        # Files come from git or are watched, never from stdin
+        arguments.filenames = [name for name in arguments.filenames if name != '-']
+        if arguments.watch and not arguments.filenames:
+            arguments.filenames = [os.curdir]
+    if arguments.maxpasses < 1:
+        cmdline.error(f"invalid maxpasses value '{arguments.maxpasses}'")
+    if arguments.jobs < 0:
+        cmdline.error(f"invalid jobs value '{arguments.jobs}'")
+    if arguments.batchsize < 1:
+        cmdline.error(f"invalid batchsize value '{arguments.batchsize}'")
+    if arguments.linter and (arguments.backend == "inprocess"):
+        cmdline.error("--linter can't be used with --backend inprocess")
+    if arguments.pipeline < 0:
+        cmdline.error(f"invalid pipeline value '{arguments.pipeline}'")
+    if arguments.pipeline and (arguments.jobs != 1):
+        cmdline.error("--pipeline can't be used with --jobs")
+    if arguments.serve == "-":
+        cmdline.error("--serve's socket can't be `-`")
+    if arguments.serve == "":
+        # Only looked for when needed, since it may import tempfile
+        arguments.serve = defaultsocket()
     return arguments
 
 
 def run(argv=None):
     """Run the program with an optional list of command line arguments."""
+    # Answer --version without building the command line parser,
+    # nor importing what's needed to fix files
+    if list(sys.argv[1:] if argv is None else argv) in (["-v"], ["--version"]):
+        sys.stdout.write(f"yamlfixer v{__version__}\n")
+        return EXIT_OK
+    from .yamlfixer import YAMLFixer  # pylint: disable=import-outside-toplevel
     arguments = parse_commandline(argv)
     yfixer = YAMLFixer(arguments)
     if arguments.listfixers:
         return yfixer.listfixers()
+    if arguments.serve:
+        from .server import FixServer  # pylint: disable=import-outside-toplevel
+        return FixServer(arguments).serve()
+    if arguments.watch:
+        from .watcher import Watcher  # pylint: disable=import-outside-toplevel
+        return Watcher(yfixer).watch()
+    if arguments.profile:
+        import cProfile  # pylint: disable=import-outside-toplevel
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(yfixer.fix)
+        finally:
+            profiler.dump_stats(arguments.profile)
     return yfixer.fix()
 
 
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+r"""Python API to fix YAML documents in memory.
+
+    >>> from yamlfixer.api import fix_string
+    >>> result = fix_string("a:   yes\n")
+    >>> result.status, result.content
+    ('fixed', '---\na: true\n')
+
+Nothing is read from nor written to any file, the cache is not used,
+and the linter is created only once for each configuration.
+"""
+
+import os
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .__main__ import parse_commandline
+from .filefixer import FileFixer
+from .linter import getlinter
+from .yamlfixer import STATUSES, WORKERSTATE, _initworker
+
+# Result of the fixing of a document :
+#   - status : "passed", "modified", "fixed" or "skipped", see yamlfixer.STATUSES
+#   - content : the fixed document
+#   - diff : the unified diff from the original document to the fixed one
+#   - issues : the number of problems reported by the linter
+#   - handled : the number of problems yamlfixer tried to fix
+FixResult = namedtuple("FixResult", "status content diff issues handled")
+
+# Linters already created, indexed by their configuration
+LINTERS = {}
+
+# Default values of the options, only parsed once
+DEFAULTS = {}
+
+# Options which can't be changed
+FIXEDOPTIONS = ("filenames", "nocache", "nochange", "config_data")
+
+
+def _arguments(config, options):
+    """Return the arguments for some yamllint configuration and yamlfixer options.
+
+    Options are named like the long command line options, e.g. maxpasses=3.
+    Raises TypeError for unknown options.
+    """
+    if not DEFAULTS:
+        DEFAULTS.update(vars(parse_commandline(["--nocache", "--nochange"])))
+    for option in options:
+        if (option not in DEFAULTS) or (option in FIXEDOPTIONS):
+            raise TypeError(f"unknown option {repr(option)}")
+    return argparse.Namespace(**dict(DEFAULTS, config_data=config, **options))
+
+
+def _getlinter(arguments):
+    """Return the linter for some arguments, creating it only once."""
+    key = (arguments.backend, arguments.linter, arguments.config_data, arguments.config_file)
+    linter = LINTERS.get(key)
+    if linter is None:
+        linter = LINTERS[key] = getlinter(arguments)
+    return linter
+
+
+def _fix(arguments, linter, text, name):
+    """Fix a document and return its FixResult."""
+    filefixer = FileFixer(arguments, name, linter)
+    filefixer.wantsdiff = True
+    filefixer.incontents = text
+    (status, unidiff) = filefixer.fixcontents()
+    return FixResult(STATUSES.get(status, {"counter": "unknown"})["counter"],
+                     filefixer.outcontents,
+                     ''.join(unidiff),
+                     filefixer.issues,
+                     filefixer.issueshandled)
+
+
+def _fixinworker(text):
+    """Fix a document from within a worker process."""
+    return _fix(WORKERSTATE["arguments"], WORKERSTATE["linter"], text, "<string>")
+
+
+def fix_string(text, config=None, name="<string>", **options):
+    """Fix a YAML document and return its FixResult.
+
+    config is yamllint's configuration as YAML source, else yamllint
+    looks for its configuration files as usual. name is only used in
+    the diff.
+    """
+    arguments = _arguments(config, options)
+    return _fix(arguments, _getlinter(arguments), text, name)
+
+
+def fix_many(texts, config=None, workers=1, **options):
+    """Fix several YAML documents and return the list of their FixResult, in the same order.
+
+    Documents are fixed by this many worker processes, `0` meaning
+    one per CPU, each with its own linter.
+    """
+    arguments = _arguments(config, options)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        linter = _getlinter(arguments)
+        return [_fix(arguments, linter, text, "<string>") for text in texts]
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_initworker,
+                             initargs=(arguments,)) as executor:
+        return list(executor.map(_fixinworker, texts, chunksize=16))
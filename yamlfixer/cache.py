@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's FixCache class."""
+
+import os
+import time
+import hashlib
+from contextlib import suppress
+
+from . import __version__
+from .common import YAMLFixerBase
+from .linter import configfingerprint
+
+# Entries not used for this long are evicted
+CACHEMAXAGE = 30 * 24 * 3600
+
+# Maximum number of entries, least recently used ones are evicted first
+CACHEMAXENTRIES = 100000
+
+# Minimum delay between two evictions
+CACHEEVICTIONDELAY = 24 * 3600
+
+# Marker file whose modification time is the last eviction's time
+CACHEEVICTIONMARKER = "lasteviction"
+
+
+class FixCache(YAMLFixerBase):
+    """To remember which contents already passed the linter's strict mode.
+
+    Each entry is an empty file whose name is a hash of the contents,
+    of yamllint's version and configuration, and of yamlfixer's version.
+    Its modification time is updated each time the entry is used.
+    """
+
+    def __init__(self, arguments):
+        """Initialize the cache."""
+        super().__init__(arguments)
+        cachehome = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser('~'), ".cache")
+        self.directory = os.path.join(cachehome, "yamlfixer")
+        self.salt = f"yamlfixer {__version__}\0{configfingerprint(arguments)}\0".encode('utf-8')
+
+    def _entry(self, yamltext):
+        """Return the path to the entry for some contents."""
+        digest = hashlib.sha256(self.salt + yamltext.encode('utf-8', errors='surrogatepass')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def __contains__(self, yamltext):
+        """Return True if contents are known to pass the linter, else False."""
+        entry = self._entry(yamltext)
+        try:
+            os.utime(entry)
+        except OSError:
+            return False
+        return True
+
+    def add(self, yamltext):
+        """Remember that contents pass the linter."""
+        entry = self._entry(yamltext)
+        try:
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            with open(entry, 'wb'):
+                pass
+        except OSError as msg:
+            self.debug(f"Impossible to add a cache entry : {msg}")
+
+    def evict(self):
+        """Evict old entries, at most once every CACHEEVICTIONDELAY seconds."""
+        now = time.time()
+        marker = os.path.join(self.directory, CACHEEVICTIONMARKER)
+        with suppress(OSError):
+            if os.path.getmtime(marker) > now - CACHEEVICTIONDELAY:
+                return
+        self.debug(f"Evicting old entries from cache {self.directory} ...")
+        entries = []
+        with suppress(OSError):
+            for subdir in os.scandir(self.directory):
+                if subdir.is_dir():
+                    with suppress(OSError), os.scandir(subdir.path) as subdircontents:
+                        entries.extend((entry.stat().st_mtime, entry.path) for entry in subdircontents)
+        entries.sort(reverse=True)
+        nbevicted = 0
+        for (index, (mtime, path)) in enumerate(entries):
+            if (index >= CACHEMAXENTRIES) or (mtime < now - CACHEMAXAGE):
+                with suppress(OSError):
+                    os.remove(path)
+                    nbevicted += 1
+        with suppress(OSError):
+            os.makedirs(self.directory, exist_ok=True)
+            with open(marker, 'wb'):
+                pass
+        self.debug(f"{nbevicted} entries evicted from cache.")
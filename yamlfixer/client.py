@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Thin client for yamlfixer's server mode.
+
+This module only imports what is needed to talk to the server,
+so that it starts as fast as possible.
+"""
+
+import sys
+import os
+import json
+import socket
+import argparse
+
+from . import __version__
+from .constants import EXIT_OK, EXIT_NOK, EXIT_PROBLEM
+from .common import YAMLFixerBase, defaultsocket
+
+
+class FixClient(YAMLFixerBase):
+    """To send files to fix to a yamlfixer server."""
+
+    def __init__(self, arguments):
+        """Initialize the client."""
+        super().__init__(arguments)
+        self.connection = self.stream = None
+
+    def connect(self):
+        """Connect to the server, or exit if impossible."""
+        self.debug(f"Connecting to {self.arguments.socket}")
+        try:
+            self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=no-member
+            self.connection.connect(self.arguments.socket)
+        except (OSError, AttributeError) as msg:
+            self.error(f"impossible to connect to yamlfixer's server at {self.arguments.socket} : {msg}")
+            sys.exit(EXIT_PROBLEM)
+        self.stream = self.connection.makefile('rwb')
+
+    def close(self):
+        """Close the connection to the server."""
+        self.stream.close()
+        self.connection.close()
+
+    def request(self, request):
+        """Send a request and return the server's response."""
+        self.stream.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.stream.flush()
+        response = self.stream.readline()
+        if not response:
+            self.error("connection closed by yamlfixer's server")
+            sys.exit(EXIT_PROBLEM)
+        return json.loads(response)
+
+    def fix(self):
+        """Fix all files."""
+        self.connect()
+        if self.arguments.shutdown:
+            self.request({"command": "shutdown"})
+            self.close()
+            return EXIT_OK
+        retcode = EXIT_OK
+        try:
+            with open(self.arguments.diffto, 'w', encoding='utf-8') as diffto:
+                for filename in self.arguments.filenames:
+                    request = {"command": "fix", "nochange": self.arguments.nochange}
+                    if filename == '-':
+                        request["content"] = sys.stdin.read()
+                    else:
+                        # The server has its own current directory
+                        request["path"] = os.path.abspath(filename)
+                    response = self.request(request)
+                    if "error" in response:
+                        self.error(response["error"])
+                        retcode = EXIT_NOK
+                        continue
+                    if filename == '-':
+                        sys.stdout.write(request["content"] if self.arguments.nochange else response["content"])
+                        sys.stdout.flush()
+                    diffto.write(response["diff"])
+                    self.debug(f"{'<stdin>' if filename == '-' else filename} {response['status']}")
+                    if response["status"] not in ("passed", "fixed", "skipped"):
+                        retcode = EXIT_NOK
+        finally:
+            self.close()
+        # Remove diffto file if it's empty.
+        if (not os.path.getsize(self.arguments.diffto)) and (self.arguments.diffto != os.devnull):
+            os.remove(self.arguments.diffto)
+        return retcode
+
+
+def run(argv=None):
+    """Run the client with an optional list of command line arguments."""
+    cmdline = argparse.ArgumentParser(prog="yamlfixer-client",
+                                      description="Fix formatting problems in YAML documents "
+                                      "using a running `yamlfixer --serve` server. "
+                                      "If no file is specified, then reads input from `stdin`.")
+    cmdline.add_argument("-v", "--version",
+                         action="version",
+                         version=f"yamlfixer-client v{__version__}",
+                         help="display this program's version number and exit.")
+    cmdline.add_argument("-d", "--debug",
+                         action="store_true",
+                         help="output debug information to stderr.")
+    cmdline.add_argument("-n", "--nochange",
+                         action="store_true",
+                         help="don't modify anything.")
+    cmdline.add_argument("-D", "--diffto",
+                         metavar="DIFF_FILE",
+                         default=os.devnull,
+                         help="name of the file a unified diff will be written to. Defaults to `%(default)s`.")
+    cmdline.add_argument("-S", "--socket",
+                         default=defaultsocket(),
+                         help="path to the server's socket. Defaults to `%(default)s`.")
+    cmdline.add_argument("--shutdown",
+                         action="store_true",
+                         help="ask the server to stop, then exit.")
+    cmdline.add_argument("filenames",
+                         nargs="*",
+                         metavar="FILE",
+                         default=["-"],  # Read from stdin if no file is specified
+                         help="the YAML files to fix. Use `-` to read from `stdin`.")
+    cmdline.set_defaults(forcecolors=False)
+    arguments = cmdline.parse_args(argv)
+    return FixClient(arguments).fix()
+
+
+if __name__ == '__main__':
+    sys.exit(run())
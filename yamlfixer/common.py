@@ -19,6 +19,7 @@
 """yamlfixer's base class."""
 
 import sys
+import os
 from contextlib import suppress
 
 COLORS = {"black": (0, 0, 0),
@@ -45,6 +46,19 @@ LEVELS = {"ERROR": "red",
           "DEBUG": "gray"}
 
 
+def defaultsocket():
+    """Return the default path to the server's socket."""
+    socketpath = os.environ.get("YAMLFIXER_SOCKET")
+    if socketpath:
+        return socketpath
+    runtimedir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtimedir:
+        return os.path.join(runtimedir, "yamlfixer.sock")
+    import tempfile  # pylint: disable=import-outside-toplevel
+    uid = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), f"yamlfixer-{uid}.sock")
+
+
 class YAMLFixerBase:
     """Base class for yamlfixer."""
 
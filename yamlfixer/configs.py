@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's ConfigResolver class."""
+
+import os
+import argparse
+from contextlib import suppress
+
+from .common import YAMLFixerBase
+from .linter import getlinter, findprojectconfig, finduserconfig, isconfigroot
+from .cache import FixCache
+
+
+class ConfigResolver(YAMLFixerBase):
+    """To lint each file with the yamllint configuration of its own directory.
+
+    Each file uses the project configuration file found in its directory
+    or its parents, as if yamllint was launched from there. Directories
+    are only searched once, and each configuration is only loaded once,
+    with its own linter and cache.
+    """
+
+    def __init__(self, arguments):
+        """Initialize the resolver."""
+        super().__init__(arguments)
+        # Mapping of directories to the configuration files applying to them
+        self.configfiles = {}
+        # Mapping of configuration files to their (linter, cache) tuples
+        self.linters = {}
+
+    def configfile(self, directory):
+        """Return the path to the configuration file applying to an absolute directory, or None."""
+        with suppress(KeyError):
+            return self.configfiles[directory]
+        configfile = findprojectconfig(directory)
+        if configfile is None:
+            if isconfigroot(directory):
+                configfile = finduserconfig()
+            else:
+                configfile = self.configfile(os.path.dirname(directory))
+        self.configfiles[directory] = configfile
+        return configfile
+
+    def resolve(self, filename):
+        """Return the (linter, cache) tuple to use for a file."""
+        directory = os.path.abspath(os.curdir if filename == '-' else os.path.dirname(filename) or os.curdir)
+        configfile = self.configfile(directory)
+        with suppress(KeyError):
+            return self.linters[configfile]
+        self.debug(f"Loading yamllint configuration {configfile or 'default'} for {directory}")
+        if configfile is None:
+            arguments = argparse.Namespace(**dict(vars(self.arguments), config_file=None, config_data="default"))
+        else:
+            arguments = argparse.Namespace(**dict(vars(self.arguments), config_file=configfile, config_data=None))
+        linter = getlinter(arguments)
+        cache = None if arguments.nocache else FixCache(arguments)
+        self.linters[configfile] = (linter, cache)
+        return (linter, cache)
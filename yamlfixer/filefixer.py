@@ -21,19 +21,19 @@
 
 import sys
 import os
-import subprocess
-import difflib
-import shlex
+import re
 from contextlib import suppress
 
 from .constants import FIX_PASSEDLINTER, FIX_MODIFIED, FIX_FIXED, FIX_SKIPPED, FIX_PERMERROR
 from .constants import FIXER_HANDLED
 from .constants import EXIT_PROBLEM
 from .common import YAMLFixerBase
-from .problemfixer import ProblemFixer
+from .linter import getlinter
+from .linebuffer import LineBuffer
+from .timings import Timings
 
-# Base YAML linting command
-LINTERCOMMAND = "yamllint --format parsable --strict"
+# Unified diff hunk header
+HUNKHEADER = re.compile(r"^@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@$")
 
 # Just in case we reintroduce a check later on...
 ALLOWEDMIMETYPES = ["text/plain",
@@ -44,56 +44,109 @@ ALLOWEDMIMETYPES = ["text/plain",
                     "application/x-yaml"]
 
 
+def _formatrange(start, stop):
+    """Return a unified diff's range, the same way difflib does."""
+    length = stop - start
+    if length == 1:
+        return f"{start + 1}"
+    return f"{start + 1 if length else start},{length}"
+
+
+def unifieddiff(original, final, opcodes, fromfile, tofile):
+    """Generate the unified diff of two lists of lines from their difflib's opcodes.
+
+    This is what difflib.unified_diff() does, but without looking for
+    the differences, which are already known.
+    """
+    import difflib  # pylint: disable=import-outside-toplevel
+    matcher = difflib.SequenceMatcher(None, [], [])
+    matcher.opcodes = opcodes
+    started = False
+    for group in matcher.get_grouped_opcodes():
+        if not started:
+            started = True
+            yield f"--- {fromfile}\n"
+            yield f"+++ {tofile}\n"
+        yield f"@@ -{_formatrange(group[0][1], group[-1][2])} +{_formatrange(group[0][3], group[-1][4])} @@\n"
+        for (tag, origstart, origend, finalstart, finalend) in group:
+            if tag == "equal":
+                for line in original[origstart:origend]:
+                    yield f" {line}"
+                continue
+            if tag in ("replace", "delete"):
+                for line in original[origstart:origend]:
+                    yield f"-{line}"
+            if tag in ("replace", "insert"):
+                for line in final[finalstart:finalend]:
+                    yield f"+{line}"
+
+
+def fsyncdirectory(directory):
+    """Flush a directory's entries to disk, if the platform allows it."""
+    with suppress(OSError):
+        dirfd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dirfd)
+        finally:
+            os.close(dirfd)
+
+
+def syncdirectories(arguments, directories):
+    """Flush the files written to some directories to disk, depending on --fsync."""
+    if arguments.fsync == "directory":
+        for directory in sorted(set(directories)):
+            fsyncdirectory(directory)
+    elif (arguments.fsync == "end") and directories and hasattr(os, "sync"):
+        os.sync()
+
+
 class FileFixer(YAMLFixerBase):  # pylint: disable=too-many-instance-attributes
     """To hold file fixing logic."""
 
-    def __init__(self, arguments, filename):
+    def __init__(self, arguments, filename, linter=None, cache=None):
         """Initialize a file to fix."""
         super().__init__(arguments)
         self.filename = filename
-        self.loffset = self.coffset = 0
-        self.incontents = None
-        self.lines = []
+        self.linter = linter or getlinter(arguments)
+        self.cache = cache
+        self.coffset = 0
+        self.incontents = self.outcontents = None
+        self.lines = LineBuffer([])
         self.issues = self.issueshandled = 0
+        self.mayintroduceproblems = False
+        self.timings = Timings(arguments.timings)
+        # Diffs are only computed if someone reads them
+        self.wantsdiff = arguments.diffto != os.devnull
+        # Directory of the file once written, see syncdirectories()
+        self.writtendir = None
+        # Report's entries for each problem, only with --report
+        self.report = [] if arguments.report else None
+        # The (linter's exitcode, linter's problems) tuple for the
+        # original contents, when already linted with other files
+        self.prelinted = None
+        # The linter's problems on the original contents, once known
+        self.originalproblems = None
 
-    def _canonicalizeproblems(self, linteroutput):
+    @staticmethod
+    def _canonicalizeproblems(problems):
         """Create a nested mapping of lines and columns to fix."""
         problemlines = {}
-        for line in linteroutput.splitlines():
-            (_, linenumber, colnumber, message) = line.split(':', 3)
-            (_, msg) = message.strip().split(' ', 1)
-            colstofix = problemlines.setdefault(int(linenumber), {})
+        for (linenumber, colnumber, _, msg) in problems:
+            colstofix = problemlines.setdefault(linenumber, {})
             # On a given line, there could be several problems on the same column
-            coltofix = colstofix.setdefault(int(colnumber), [])
+            coltofix = colstofix.setdefault(colnumber, [])
             coltofix.append(msg)
-            self.issues += 1
         return problemlines
 
-    def lint(self, content):
+    def lint(self, content, phase="lint"):
         """Launch the linter on a file's content.
 
-        Returns the (linter's exitcode, linter's stdout) tuple.
+        Returns the (linter's exitcode, linter's problems) tuple.
         """
-        command = LINTERCOMMAND
-        if self.arguments.config_data:
-            confdata = self.arguments.config_data.strip()
-            if confdata:
-                command = f"{command} --config-data {shlex.quote(confdata)}"
-        elif self.arguments.config_file:
-            conffile = self.arguments.config_file.strip()
-            if conffile:
-                command = f"{command} --config-file {shlex.quote(conffile)}"
-        command = f"{command} -"
-        self.debug(f"Executing linter with {repr(command)}")
-        linter = subprocess.run(command,
-                                shell=True,
-                                capture_output=True,
-                                text=True,
-                                check=False,
-                                input=content,
-                                encoding='utf-8')
-        self.debug(f"Linter's exit code is {repr(linter.returncode)}")
-        return (linter.returncode, linter.stdout)
+        with self.timings.phase(phase):
+            (exitcode, problems) = self.linter.lint(content)
+        self.debug(f"Linter's exit code is {repr(exitcode)}")
+        return (exitcode, problems)
 
     def load(self):
         """Load the input file's content."""
@@ -113,19 +166,41 @@ class FileFixer(YAMLFixerBase):  # pylint: disable=too-many-instance-attributes
         except (UnicodeDecodeError, IsADirectoryError) as msg:
             self.error(f"{self.filename} doesn't seem to be YAML : {msg}")
 
+    def _editsdiff(self, finalcontent, relbefore, relafter):
+        """Return a unified diff built from the edits of the last fixing pass, or None.
+
+        This is only possible if the last pass started from the original
+        contents, which must also have been split on newlines only.
+        """
+        if (self.incontents is None) or ('\n'.join(self.lines.original) + '\n' != self.incontents):
+            return None
+        opcodes = self.lines.opcodes()
+        final = finalcontent.split('\n')[:-1]
+        if (not opcodes) or (opcodes[-1][4] != len(final)):
+            # Some fixer put newlines in a line
+            return None
+        original = [f"{line}\n" for line in self.lines.original]
+        final = [f"{line}\n" for line in final]
+        return list(unifieddiff(original, final, opcodes, relbefore, relafter))
+
     def diff(self, finalcontent):
         """Return a unified diff of original content to final one."""
         differences = []
+        if finalcontent == (self.incontents or ''):
+            return differences
+        relbefore = f'"{self.filename}"'
+        relafter = f'"{self.filename}-after"'
+        differences.append(f"diff -u {relbefore} {relafter}\n")
+        editsdiff = self._editsdiff(finalcontent, relbefore, relafter)
+        if editsdiff is not None:
+            differences.extend(editsdiff)
+            return differences
+        import difflib  # pylint: disable=import-outside-toplevel
         original = (self.incontents or '').splitlines(keepends=True)
-        final = finalcontent.splitlines(keepends=True)
-        if original != final:
-            relbefore = f'"{self.filename}"'
-            relafter = f'"{self.filename}-after"'
-            differences.append(f"diff -u {relbefore} {relafter}\n")
-            differences.extend(list(difflib.unified_diff(original,
-                                                         final,
-                                                         fromfile=relbefore,
-                                                         tofile=relafter)))
+        differences.extend(list(difflib.unified_diff(original,
+                                                     finalcontent.splitlines(keepends=True),
+                                                     fromfile=relbefore,
+                                                     tofile=relafter)))
         with suppress(IndexError):  # would be raised if original file was empty
             if not original[-1].endswith("\n"):
                 # No newline at EOF
@@ -138,13 +213,51 @@ class FileFixer(YAMLFixerBase):  # pylint: disable=too-many-instance-attributes
                 differences.insert(-nbplus, "\n\\ No newline at end of file\n")
         return differences
 
-    def dump(self, outcontents):
-        """Dump the new file's contents."""
+    def dump(self, outcontents, ltexitcode=None, trusted=False):
+        """Dump the new file's contents.
+
+        The linter's exit code on the new contents, if already known,
+        or trusted fixes, spare another run of the linter.
+        """
         if (self.incontents is None) or (outcontents == self.incontents):
             retcode = FIX_SKIPPED
+            if self.originalproblems:
+                # The original contents weren't changed, so all their problems remain
+                self._reportremaining(self.originalproblems)
         else:
             retcode = FIX_MODIFIED
-        finaloutput = outcontents or ''
+        finaloutput = self.outcontents = outcontents or ''
+        with self.timings.phase("write"):
+            retcode = self._write(finaloutput, retcode)
+
+        # We've successfully modified the file, so we lint its new contents
+        if retcode == FIX_MODIFIED:
+            if trusted:
+                # All problems were handled by fixers which can't introduce
+                # new ones, so we assume the file now passes yamllint's strict
+                # mode, but don't cache it since it wasn't verified.
+                self.debug("Fixes are trusted, not linting again")
+                retcode = FIX_FIXED
+            else:
+                if ltexitcode is None:
+                    (ltexitcode, remaining) = self.lint(finaloutput, phase="relint")
+                    self._reportremaining(remaining)
+                if not ltexitcode:
+                    # We know we have succesfully fixed the file
+                    # because it now passes yamlllint's strict mode.
+                    retcode = FIX_FIXED
+                    if self.cache is not None:
+                        self.cache.add(finaloutput)
+        if not self.wantsdiff:
+            return (retcode, [])
+        with self.timings.phase("diff"):
+            return (retcode, self.diff(finaloutput))
+
+    def _write(self, finaloutput, retcode):
+        """Write the new file's contents, if needed.
+
+        Returns the possibly updated fixing status.
+        """
         if self.arguments.nochange:
             # We don't want to modify anything
             if self.filename == '-':  # Always dump original input to stdout in this case
@@ -157,61 +270,333 @@ class FileFixer(YAMLFixerBase):  # pylint: disable=too-many-instance-attributes
                 sys.stdout.flush()
             elif retcode == FIX_MODIFIED:  # Don't write unnecessarily
                 try:
-                    if self.arguments.backup:
-                        # Try to make a backup of the original file
-                        try:
-                            os.replace(self.filename,
-                                       f"{self.filename}{self.arguments.backupsuffix}")
-                        except PermissionError as msg:
-                            self.error(f"impossible to create a backup : {msg}")
-                    # Overwrite the original file with the new contents
-                    with open(self.filename, 'w', encoding='utf-8') as yamlfile:
-                        yamlfile.write(finaloutput)
+                    if self.arguments.atomic:
+                        self._saveatomically(finaloutput)
+                    else:
+                        self._save(finaloutput)
+                    self.writtendir = os.path.dirname(os.path.realpath(self.filename))
                 except PermissionError as msg:
                     self.error(f"impossible to save modified contents : {msg}")
                     retcode = FIX_PERMERROR
+        return retcode
 
-        # We've successfully modified the file, so we lint its new contents
-        if retcode == FIX_MODIFIED:
-            (ltexitcode, _) = self.lint(finaloutput)
-            if not ltexitcode:
-                # We know we have succesfully fixed the file
-                # because it now passes yamlllint's strict mode.
-                retcode = FIX_FIXED
-        return (retcode, self.diff(finaloutput))
+    def _writecontents(self, yamlfile, finaloutput):
+        """Write contents to an opened file, flushing them to disk if needed."""
+        yamlfile.write(finaloutput)
+        if self.arguments.fsync in ("file", "directory"):
+            yamlfile.flush()
+            os.fsync(yamlfile.fileno())
+
+    def _save(self, finaloutput):
+        """Overwrite the original file with new contents."""
+        if self.arguments.backup:
+            # Try to make a backup of the original file
+            try:
+                os.replace(self.filename,
+                           f"{self.filename}{self.arguments.backupsuffix}")
+            except PermissionError as msg:
+                self.error(f"impossible to create a backup : {msg}")
+        with open(self.filename, 'w', encoding='utf-8') as yamlfile:
+            self._writecontents(yamlfile, finaloutput)
+
+    def _saveatomically(self, finaloutput):
+        """Replace the original file with a new one, so that it's never partially written.
+
+        The new file is written next to the original one, which is
+        replaced by renaming, so that either the original contents or
+        the new ones are found, even in case of a crash. Symbolic links
+        are followed, and the original permissions and ownership are kept.
+        """
+        target = os.path.realpath(self.filename)
+        directory = os.path.dirname(target)
+        import tempfile  # pylint: disable=import-outside-toplevel
+        (tmpfd, tmpname) = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(target)}.", suffix=".tmp")
+        try:
+            with open(tmpfd, 'w', encoding='utf-8') as tmpfile:
+                self._writecontents(tmpfile, finaloutput)
+            original = os.stat(target)
+            os.chmod(tmpname, original.st_mode & 0o7777)
+            if hasattr(os, "chown"):
+                with suppress(OSError):
+                    os.chown(tmpname, original.st_uid, original.st_gid)
+            if self.arguments.backup:
+                self._backupatomically(target)
+            os.replace(tmpname, target)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(tmpname)
+            raise
+        if self.arguments.fsync == "file":
+            fsyncdirectory(directory)
+
+    def _backupatomically(self, target):
+        """Make a backup of the original file, which stays in place until replaced."""
+        backupname = f"{self.filename}{self.arguments.backupsuffix}"
+        tmpbackupname = f"{backupname}.{os.getpid()}.tmp"
+        try:
+            try:
+                os.link(target, tmpbackupname)
+            except OSError:
+                # Hard links are not supported everywhere
+                import shutil  # pylint: disable=import-outside-toplevel
+                shutil.copy2(target, tmpbackupname)
+            os.replace(tmpbackupname, backupname)
+        except OSError as msg:
+            with suppress(OSError):
+                os.remove(tmpbackupname)
+            self.error(f"impossible to create a backup : {msg}")
+
+    def _documents(self):
+        """Generate the (separator, document) tuples read from stdin, one at a time.
+
+        Directives and comments before a document start marker
+        belong to the document which follows them. Blank lines
+        between documents are the separator, so that they aren't
+        linted as blank lines at the end of a file.
+        """
+        separator = ''
+        document = []
+        hascontent = False
+        try:
+            for line in sys.stdin:
+                if hascontent and line.startswith('---') and (line[3:4] in ('', ' ', '\t', '\n')):
+                    nbcontent = len(document)
+                    while document[nbcontent - 1] in ('\n', '\r\n'):
+                        nbcontent -= 1
+                    yield (separator, ''.join(document[:nbcontent]))
+                    separator = ''.join(document[nbcontent:])
+                    document = []
+                    hascontent = False
+                document.append(line)
+                stripped = line.strip()
+                if stripped and not stripped.startswith(('#', '%')):
+                    hascontent = True
+        except KeyboardInterrupt:
+            self.error("\nInterrupted at user's request.")
+        if document:
+            yield (separator, ''.join(document))
+
+    @staticmethod
+    def _shiftdiff(differences, origoffset, finaloffset):
+        """Shift a unified diff's hunks by some numbers of lines."""
+        shifted = []
+        for line in differences:
+            match = HUNKHEADER.match(line.rstrip('\n'))
+            if match is not None:
+                (origstart, origlen, finalstart, finallen) = match.groups()
+                line = (f"@@ -{int(origstart) + origoffset}{origlen or ''} "
+                        f"+{int(finalstart) + finaloffset}{finallen or ''} @@\n")
+            shifted.append(line)
+        return shifted
+
+    def _fixstream(self):
+        """Fix the documents read from stdin and output them one at a time.
+
+        Memory usage is bounded by the largest document instead of the whole input.
+        """
+        statuses = set()
+        differences = []
+        origoffset = finaloffset = 0
+        for (separator, document) in self._documents():
+            if separator:
+                # Blank lines between documents are output as is
+                sys.stdout.write(separator)
+                origoffset += len(separator.splitlines())
+                finaloffset += len(separator.splitlines())
+            docfixer = FileFixer(self.arguments, self.filename, self.linter, self.cache)
+            docfixer.wantsdiff = self.wantsdiff
+            docfixer.incontents = document
+            (status, docdiff) = docfixer.fixcontents()
+            statuses.add(status)
+            self.issues += docfixer.issues
+            self.issueshandled += docfixer.issueshandled
+            self.timings.merge(docfixer.timings)
+            if docdiff:
+                docdiff = self._shiftdiff(docdiff, origoffset, finaloffset)
+                # Only the first document's diff keeps its header
+                differences.extend(docdiff if not differences else docdiff[3:])
+            if self.report is not None:
+                # Remaining problems are found in the fixed documents
+                for entry in docfixer.report:
+                    entry["line"] += finaloffset if entry["outcome"] == "remaining" else origoffset
+                self.report.extend(docfixer.report)
+            origoffset += len(document.splitlines())
+            finaloffset += len(docfixer.outcontents.splitlines())
+        if statuses <= {FIX_PASSEDLINTER}:
+            return (FIX_PASSEDLINTER, differences)
+        if statuses <= {FIX_PASSEDLINTER, FIX_FIXED}:
+            return (FIX_FIXED, differences)
+        if statuses <= {FIX_PASSEDLINTER, FIX_SKIPPED}:
+            return (FIX_SKIPPED, differences)
+        return (FIX_MODIFIED, differences)
 
     def fix(self):
         """Fix a file's contents."""
+        if (self.filename == '-') and self.arguments.stream:
+            return self._fixstream()
+
         # Load the file's contents in memory
         self.load()
+        return self.fixcontents()
 
+    def fixcontents(self):
+        """Fix the already loaded contents."""
         # Skip that file if we don't want to modify it
         if (self.incontents is None) or self.incontents.startswith('$ANSIBLE_VAULT;'):
             return self.dump(self.incontents)
 
-        # Lint the file's contents
-        (ltexitcode, ltstdout) = self.lint(self.incontents)
-        if not ltexitcode:
+        # Skip linting if these contents are known to pass the linter
+        if (self.cache is not None) and (self.incontents in self.cache):
+            self.debug("Contents found in cache")
             (_, differences) = self.dump(self.incontents)
             return (FIX_PASSEDLINTER, differences)
+
+        # Lint the file's contents
+        (lintedcontents, ltexitcode, ltproblems) = self._firstlint()
+        if lintedcontents == self.incontents:
+            self.originalproblems = ltproblems
+        if not ltexitcode:
+            if self.cache is not None:
+                self.cache.add(lintedcontents)
+            # Contents fixed by the prescan are now known to pass the linter
+            (status, differences) = self.dump(lintedcontents, 0)
+            return (FIX_PASSEDLINTER if lintedcontents == self.incontents else status, differences)
         if ltexitcode == 127:  # yamllint not found !
             self.error("yamllint is not in your PATH, please ensure it's installed.")
             sys.exit(EXIT_PROBLEM)
 
+        # Fix the problems, then lint again and fix the remaining problems
+        # as long as they change without growing in number, up to --maxpasses
+        # times. This is needed because yamllint only reports the first
+        # faulty line in a block.
+        lines = lintedcontents.splitlines()
+        nbpasses = 1
+        while True:
+            with self.timings.phase("fix"):
+                self.lines = LineBuffer(lines)
+                complete = self._fixproblems(ltproblems, nbpasses)
+                lines = self.lines.materialize()
+            if nbpasses >= self.arguments.maxpasses:
+                # The final contents were never linted
+                return self.dump('\n'.join(lines) + '\n',
+                                 trusted=self.arguments.trustfixers and complete and self._withinlinelength())
+            (ltexitcode, newproblems) = self.lint('\n'.join(lines) + '\n', phase="relint")
+            if (not ltexitcode) or (len(newproblems) > len(ltproblems)) or (newproblems == ltproblems):
+                # The final contents were just linted, and their problems are
+                # the remaining ones even if they're the original contents
+                self._reportremaining(newproblems)
+                self.originalproblems = None
+                return self.dump('\n'.join(lines) + '\n', ltexitcode)
+            ltproblems = newproblems
+            nbpasses += 1
+            self.debug(f"Pass #{nbpasses}")
+
+    def _firstlint(self):
+        """Lint the file's contents, unless already done.
+
+        With --prescan, textual problems are fixed first, and the new
+        contents aren't linted if they are known to pass the linter.
+        Returns the (linted contents, linter's exitcode, linter's problems) tuple.
+        """
+        if self.prelinted is not None:
+            return (self.incontents, *self.prelinted)
+        prescanned = self._prescan() if self.arguments.prescan else self.incontents
+        if (prescanned != self.incontents) and (self.cache is not None) and (prescanned in self.cache):
+            self.debug("Prescanned contents found in cache")
+            return (prescanned, 0, [])
+        return (prescanned, *self.lint(prescanned))
+
+    def _prescan(self):
+        """Fix the textual problems found without the linter, and return the new contents."""
+        enabledrules = getattr(self.linter, "enabledrules", None)
+        if enabledrules is None:
+            # yamllint's configuration is unknown
+            return self.incontents
+        with self.timings.phase("fix"):
+            from .prescanner import PreScanner  # pylint: disable=import-outside-toplevel
+            problems = PreScanner(enabledrules()).problems(self.incontents)
+            if not problems:
+                return self.incontents
+            self.debug(f"Prescan found {len(problems)} problems")
+            self.lines = LineBuffer(self.incontents.splitlines())
+            self._fixproblems(problems, nbpass=0)
+            return '\n'.join(self.lines.materialize()) + '\n'
+
+    def _withinlinelength(self):
+        """Return True if the lines edited during the last pass are known to be short enough, else False."""
+        maxlinelength = getattr(self.linter, "maxlinelength", None)
+        if maxlinelength is None:
+            # yamllint's configuration is unknown
+            return False
+        maxlength = maxlinelength()
+        return (maxlength is None) or all(len(line) <= maxlength for line in self.lines.edited())
+
+    def _reportremaining(self, problems):
+        """Add the problems remaining once fixed to the report."""
+        if self.report is not None:
+            from .report import reportentry  # pylint: disable=import-outside-toplevel
+            self.report.extend(reportentry(problem, "remaining") for problem in problems)
+
+    def _fixproblems(self, problems, nbpass=1):
+        """Fix each of the problems reported by the linter during a pass.
+
+        Returns True if all problems were handled by fixers which
+        can't introduce new problems, else False. Only the problems
+        found in the original contents, by the prescan and the first
+        pass, are counted as issues: later passes only make progress
+        on them.
+        """
+        outcomes = {}
+        complete = True
+        self.mayintroduceproblems = False
+        if nbpass <= 1:
+            self.issues += len(problems)
         # Organize the set of problems to fix
-        linestofix = self._canonicalizeproblems(ltstdout)
+        linestofix = self._canonicalizeproblems(problems)
 
         # Now handle each of the problems reported by yamllint
-        self.lines = self.incontents.splitlines()
+        from .problemfixer import ProblemFixer  # pylint: disable=import-outside-toplevel
+        problemfixer = ProblemFixer(self)
         for linenumber in sorted(linestofix.keys()):
             self.coffset = 0
             for colnumber in sorted(linestofix[linenumber].keys()):
                 for problem in linestofix[linenumber][colnumber]:
-                    self.debug(f"({linenumber}+{self.loffset}, {colnumber}+{self.coffset}) => [{problem}]")
-                    handled = ProblemFixer(self, linenumber, colnumber, problem)()
+                    self.debug(f"({linenumber}, {colnumber}+{self.coffset}) => [{problem}]")
+                    handled = problemfixer(linenumber, colnumber, problem)
                     if handled == FIXER_HANDLED:
-                        self.issueshandled += 1
+                        if nbpass <= 1:
+                            self.issueshandled += 1
                         self.debug(f"HANDLED: #{self.issueshandled}")
                     else:
+                        complete = False
                         self.debug("UNHANDLED")
-        return self.dump('\n'.join(self.lines) + '\n')
+                    outcomes[(linenumber, colnumber, problem)] = handled
+        if self.report is not None:
+            from .report import reportentry  # pylint: disable=import-outside-toplevel
+            for problem in problems:
+                (linenumber, colnumber, _, msg) = problem
+                outcome = "handled" if outcomes[(linenumber, colnumber, msg)] == FIXER_HANDLED else "unhandled"
+                self.report.append(reportentry(problem, outcome, nbpass))
+        return complete and not self.mayintroduceproblems
+
+
+def fixfile(arguments, linter, cache, filename, configs=None):
+    """Fix a file, with the linter and cache of its directory's configuration if configs is given.
+
+    Returns the (status, unified diff, issues, handled issues, timings, written directory,
+    report's entries) tuple, timings being None unless --timings is used, the written
+    directory being None unless the file was written, and the report's entries being
+    None unless --report is used.
+    """
+    if configs is not None:
+        (linter, cache) = configs.resolve(filename)
+    filetofix = FileFixer(arguments, filename, linter, cache)
+    filetofix.debug(f"Fixing {'<stdin>' if filename == '-' else filename} ... ")
+    return fixresults(filetofix, *filetofix.fix())
+
+
+def fixresults(filetofix, status, unidiff):
+    """Return fixfile()'s results for a fixed file."""
+    timings = filetofix.timings.asdict() if filetofix.timings.enabled else None
+    return (status, unidiff, filetofix.issues, filetofix.issueshandled, timings, filetofix.writtendir,
+            filetofix.report)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's LineBuffer class."""
+
+
+class LineBuffer:
+    """To edit lines using their original line numbers.
+
+    Replacements, deletions and insertions are recorded against the
+    original lines, each in constant time, and the edited lines are only
+    materialised when iterating over the buffer.
+    """
+
+    def __init__(self, lines):
+        """Initialize the buffer from a list of lines."""
+        self.original = lines
+        # Current contents of each original line, None once deleted
+        self.current = list(lines)
+        # Lists of lines inserted before each original line, the
+        # lines inserted at index len(self) being appended at the end
+        self.inserted = {}
+
+    def __len__(self):
+        """Return the number of original lines."""
+        return len(self.current)
+
+    def _index(self, index):
+        """Return a non negative index, or raise IndexError if out of range."""
+        if index < 0:
+            index += len(self.current)
+        if not 0 <= index < len(self.current):
+            raise IndexError("line index out of range")
+        return index
+
+    def __getitem__(self, index):
+        """Return the current contents of an original line, empty once deleted."""
+        return self.current[self._index(index)] or ''
+
+    def __setitem__(self, index, line):
+        """Replace the contents of an original line."""
+        self.current[self._index(index)] = line
+
+    def __delitem__(self, index):
+        """Delete an original line, or a slice of original lines."""
+        if isinstance(index, slice):
+            for lnum in range(*index.indices(len(self.current))):
+                self.current[lnum] = None
+        else:
+            self.current[self._index(index)] = None
+
+    def insert(self, index, line):
+        """Insert a line before an original line, the same way lists do."""
+        nblines = len(self.current)
+        if index < 0:
+            index = max(0, index + nblines)
+        self.inserted.setdefault(min(index, nblines), []).append(line)
+
+    def __iter__(self):
+        """Iterate over the edited lines."""
+        inserted = self.inserted
+        for (lnum, line) in enumerate(self.current):
+            if lnum in inserted:
+                yield from inserted[lnum]
+            if line is not None:
+                yield line
+        yield from inserted.get(len(self.current), [])
+
+    def edited(self):
+        """Generate the lines which were either replaced or inserted."""
+        for (line, original) in zip(self.current, self.original):
+            if (line is not None) and (line != original):
+                yield line
+        for lines in self.inserted.values():
+            yield from lines
+
+    def _segments(self):
+        """Generate the (changed, number of original lines, number of edited lines) tuples."""
+        for (lnum, line) in enumerate(self.current):
+            if lnum in self.inserted:
+                yield (True, 0, len(self.inserted[lnum]))
+            if line is None:
+                yield (True, 1, 0)
+            else:
+                yield (line != self.original[lnum], 1, 1)
+        yield (True, 0, len(self.inserted.get(len(self.current), ())))
+
+    def opcodes(self):
+        """Return the list of difflib's opcodes turning the original lines into the edited ones.
+
+        Consecutive edits are grouped, so that only equal lines separate them.
+        """
+        opcodes = []
+        (origstart, editedstart, orignum, editednum) = (0, 0, 0, 0)
+        changing = False
+        for (changed, nborig, nbedited) in self._segments():
+            if (changed != changing) and (nborig or nbedited):
+                if (orignum, editednum) != (origstart, editedstart):
+                    opcodes.append(self._opcode(changing, origstart, orignum, editedstart, editednum))
+                (origstart, editedstart, changing) = (orignum, editednum, changed)
+            orignum += nborig
+            editednum += nbedited
+        if (orignum, editednum) != (origstart, editedstart):
+            opcodes.append(self._opcode(changing, origstart, orignum, editedstart, editednum))
+        return opcodes
+
+    @staticmethod
+    def _opcode(changed, origstart, origend, editedstart, editedend):
+        """Return difflib's opcode for a group of lines."""
+        if not changed:
+            tag = "equal"
+        elif origstart == origend:
+            tag = "insert"
+        elif editedstart == editedend:
+            tag = "delete"
+        else:
+            tag = "replace"
+        return (tag, origstart, origend, editedstart, editedend)
+
+    def materialize(self):
+        """Return the list of edited lines."""
+        return list(self)
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's linting backends."""
+
+import sys
+import os
+import re
+from contextlib import suppress
+
+from .constants import EXIT_PROBLEM
+from .common import YAMLFixerBase
+
+# Default YAML linting command
+LINTERCOMMAND = "yamllint"
+
+# Options always given to the linting command
+LINTEROPTIONS = ("--format", "parsable", "--strict")
+
+# A problem in yamllint's parsable output, the path possibly containing colons
+PARSABLEPROBLEM = re.compile(r"^(.*):(\d+):(\d+): \[(\w+)\] (.*)$")
+
+# Project configuration files, as searched for by yamllint
+PROJECTCONFIGS = (".yamllint", ".yamllint.yaml", ".yamllint.yml")
+
+# The configuration extended by a yamllint configuration, in block or flow style
+EXTENDS = re.compile(r"""^(?:[^#\n]*[{,\s])?extends\s*:\s*["']?([^\s,{}"'#]+)""", re.MULTILINE)
+
+# Maximum number of configurations extending each other
+MAXEXTENDS = 16
+
+# Files ignored by a yamllint configuration, as a whole or by one of its rules
+IGNORES = re.compile(r"^(?:[^#\n]*[{,\s])?ignore(?:-from-file)?\s*:", re.MULTILINE)
+
+
+def findprojectconfig(directory):
+    """Return the path to the project configuration file in a directory, if any."""
+    for filename in PROJECTCONFIGS:
+        filepath = os.path.join(directory, filename)
+        if os.path.isfile(filepath):
+            return filepath
+    return None
+
+
+def isconfigroot(directory):
+    """Return True if project configuration files are not searched above a directory, else False."""
+    return directory in (os.path.abspath(os.path.expanduser('~')), os.path.dirname(directory))
+
+
+def finduserconfig():
+    """Return the path to the user configuration file yamllint would use, if any."""
+    if "YAMLLINT_CONFIG_FILE" in os.environ:
+        userconfig = os.path.expanduser(os.environ["YAMLLINT_CONFIG_FILE"])
+    elif "XDG_CONFIG_HOME" in os.environ:
+        userconfig = os.path.join(os.environ["XDG_CONFIG_HOME"], "yamllint", "config")
+    else:
+        userconfig = os.path.expanduser("~/.config/yamllint/config")
+    if os.path.isfile(userconfig):
+        return userconfig
+    return None
+
+
+def findconfig():
+    """Return the path to the project or user configuration file yamllint would use, if any."""
+    path = os.path.abspath(os.curdir)
+    while True:
+        filepath = findprojectconfig(path)
+        if filepath is not None:
+            return filepath
+        if isconfigroot(path):
+            return finduserconfig()
+        path = os.path.dirname(path)
+
+
+def readconfig(conffile):
+    """Return the text of a configuration file, or an empty string if it can't be read."""
+    with suppress(OSError), open(conffile, 'rb') as configfile:
+        return configfile.read().decode('utf-8', errors='replace')
+    return ''
+
+
+def extendedconfigs(conftext):
+    """Generate the (path, text) tuples of the custom configuration files extended by a configuration.
+
+    Configurations shipped with yamllint are identified by yamllint's
+    version, so they are skipped. Extended files are searched for
+    the same way yamllint does, without importing its modules.
+    """
+    try:
+        import yamllint  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        stdconfdir = None
+    else:
+        stdconfdir = os.path.join(os.path.dirname(os.path.realpath(yamllint.__file__)), "conf")
+    for _ in range(MAXEXTENDS):
+        match = EXTENDS.search(conftext)
+        if match is None:
+            return
+        name = match.group(1)
+        if ('/' not in name) and (stdconfdir is not None) \
+           and os.path.isfile(os.path.join(stdconfdir, f"{name}.yaml")):
+            return
+        conftext = readconfig(name)
+        yield (name, conftext)
+
+
+def configtexts(arguments):
+    """Return the list of (name, text) tuples of yamllint's configuration and of the custom ones it extends."""
+    confdata = (arguments.config_data or '').strip()
+    conffile = (arguments.config_file or '').strip() or findconfig()
+    if confdata:
+        texts = [(confdata, confdata if ':' in confdata else f"extends: {confdata}")]
+    elif conffile:
+        texts = [(conffile, readconfig(conffile))]
+    else:
+        texts = [("default", '')]
+    texts.extend(extendedconfigs(texts[0][1]))
+    return texts
+
+
+def configfingerprint(arguments):
+    """Return a string identifying yamllint's version and configuration.
+
+    The texts of the custom configuration files it extends are included,
+    so that modifying any of them changes the fingerprint.
+    """
+    parts = []
+    with suppress(ImportError):
+        from yamllint import APP_VERSION  # pylint: disable=import-outside-toplevel
+        parts.append(f"yamllint {APP_VERSION}")
+    if getattr(arguments, "linter", None):
+        parts.append(arguments.linter)
+    for (name, conftext) in configtexts(arguments):
+        parts.extend([name, conftext])
+    return '\0'.join(parts)
+
+
+class SubprocessLinter(YAMLFixerBase):
+    """To lint contents by launching yamllint as an external command."""
+
+    name = "subprocess"
+
+    def __init__(self, arguments):
+        """Find the linting command and build its arguments once for all.
+
+        Exits if the linting command can't be found.
+        """
+        super().__init__(arguments)
+        # pylint: disable=import-outside-toplevel
+        import shutil
+        import shlex
+        command = getattr(arguments, "linter", None) or LINTERCOMMAND
+        self.executable = shutil.which(command)
+        if self.executable is None:
+            if command == LINTERCOMMAND:
+                self.error("yamllint is not in your PATH, please ensure it's installed.")
+            else:
+                self.error(f"{command} can't be found or isn't executable.")
+            sys.exit(EXIT_PROBLEM)
+        self.debug(f"Using yamllint command {repr(self.executable)}")
+        self.baseargv = self._baseargv()
+        self.argv = self.baseargv + ["-"]
+        # shlex.join() needs Python 3.8
+        self.command = ' '.join(shlex.quote(arg) for arg in self.argv)
+        self.basecommand = ' '.join(shlex.quote(arg) for arg in self.baseargv)
+        # Contents are linted from stdin, where yamllint doesn't apply ignore
+        # patterns, so files using them can't be linted together by path
+        self.hasignores = any(IGNORES.search(conftext) for (_, conftext) in configtexts(arguments))
+
+    def _baseargv(self):
+        """Return the linting command's arguments, without any file to lint."""
+        argv = [self.executable, *LINTEROPTIONS]
+        if self.arguments.config_data:
+            confdata = self.arguments.config_data.strip()
+            if confdata:
+                argv.extend(["--config-data", confdata])
+        elif self.arguments.config_file:
+            conffile = self.arguments.config_file.strip()
+            if conffile:
+                argv.extend(["--config-file", conffile])
+        return argv
+
+    @staticmethod
+    def _parse(linteroutput):
+        """Return the list of problems from yamllint's parsable output."""
+        problems = []
+        for line in linteroutput.splitlines():
+            (_, linenumber, colnumber, message) = line.split(':', 3)
+            (level, msg) = message.strip().split(' ', 1)
+            problems.append((int(linenumber), int(colnumber), level.strip('[]'), msg))
+        return problems
+
+    def lint(self, content):
+        """Launch the linter on some content.
+
+        Returns the (linter's exitcode, list of problems) tuple.
+        """
+        import subprocess  # pylint: disable=import-outside-toplevel
+        self.debug(f"Executing linter with {repr(self.command)}")
+        try:
+            linter = subprocess.run(self.argv,
+                                    capture_output=True,
+                                    text=True,
+                                    check=False,
+                                    input=content,
+                                    encoding='utf-8')
+        except FileNotFoundError:
+            return (127, [])
+        return (linter.returncode, self._parse(linter.stdout))
+
+    async def lintasync(self, content):
+        """Launch the linter on some content, without blocking the event loop.
+
+        Returns the (linter's exitcode, list of problems) tuple.
+        """
+        # pylint: disable=import-outside-toplevel
+        import asyncio
+        import subprocess
+        self.debug(f"Executing linter asynchronously with {repr(self.command)}")
+        try:
+            linter = await asyncio.create_subprocess_exec(*self.argv,
+                                                          stdin=subprocess.PIPE,
+                                                          stdout=subprocess.PIPE,
+                                                          stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            return (127, [])
+        (stdout, _) = await linter.communicate(content.encode('utf-8'))
+        return (linter.returncode, self._parse(stdout.decode('utf-8')))
+
+    def lintfiles(self, paths):
+        """Launch the linter once on several files.
+
+        Returns the mapping of paths to (linter's exitcode, list of problems)
+        tuples, with the exit codes yamllint would return in strict mode for
+        each file, or None if the linter failed or if yamllint's configuration
+        ignores some files, since their contents are linted again from stdin.
+        """
+        if self.hasignores:
+            self.debug("Not linting files together since yamllint's configuration ignores some files")
+            return None
+        import subprocess  # pylint: disable=import-outside-toplevel
+        self.debug(f"Executing linter on {len(paths)} files with {repr(self.basecommand)}")
+        try:
+            linter = subprocess.run(self.baseargv + ["--", *paths],
+                                    capture_output=True,
+                                    text=True,
+                                    check=False,
+                                    encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        if linter.returncode not in (0, 1, 2):
+            self.debug(f"Linter's exit code is {repr(linter.returncode)} : {linter.stderr.strip()}")
+            return None
+        results = {path: (0, []) for path in paths}
+        for line in linter.stdout.splitlines():
+            match = PARSABLEPROBLEM.match(line)
+            if (match is None) or (match.group(1) not in results):
+                continue
+            (path, linenumber, colnumber, level, msg) = match.groups()
+            (exitcode, problems) = results[path]
+            problems.append((int(linenumber), int(colnumber), level, msg))
+            if level == "error":
+                exitcode = 1
+            elif not exitcode:
+                exitcode = 2
+            results[path] = (exitcode, problems)
+        return results
+
+
+class InProcessLinter(YAMLFixerBase):
+    """To lint contents with yamllint's own modules, without any subprocess.
+
+    yamllint's modules are only imported, and its configuration parsed,
+    the first time they are needed, so that contents found in the cache
+    don't pay for them.
+    """
+
+    name = "inprocess"
+
+    def __init__(self, arguments):
+        """Check that yamllint can be imported.
+
+        Raises ImportError if yamllint can't be imported.
+        """
+        super().__init__(arguments)
+        import yamllint  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
+        self._linter = self._conf = None
+
+    @property
+    def conf(self):
+        """Return yamllint's configuration, loading it and yamllint's linter the first time."""
+        if self._conf is None:
+            # pylint: disable=import-outside-toplevel
+            from yamllint import linter
+            from yamllint.config import YamlLintConfig, YamlLintConfigError
+            self._linter = linter
+            try:
+                conf = self._loadconfig(YamlLintConfig)
+            except YamlLintConfigError as msg:
+                self.error(f"{msg}")
+                sys.exit(EXIT_PROBLEM)
+            if getattr(conf, "locale", None) is not None:
+                import locale
+                locale.setlocale(locale.LC_ALL, conf.locale)
+            # Set last, since other threads may lint as soon as it is set
+            self._conf = conf
+        return self._conf
+
+    def _loadconfig(self, configclass):
+        """Load yamllint's configuration the same way yamllint does."""
+        confdata = (self.arguments.config_data or '').strip()
+        conffile = (self.arguments.config_file or '').strip()
+        if confdata:
+            if ':' not in confdata:
+                confdata = f"extends: {confdata}"
+            self.debug(f"Using yamllint configuration data {repr(confdata)}")
+            return configclass(content=confdata)
+        if not conffile:
+            conffile = findconfig()
+        if conffile:
+            self.debug(f"Using yamllint configuration file {repr(conffile)}")
+            return configclass(file=conffile)
+        self.debug("Using yamllint default configuration")
+        return configclass(content="extends: default")
+
+    def maxlinelength(self):
+        """Return the maximum line length allowed by yamllint's configuration, or None."""
+        rule = self.conf.rules.get("line-length")
+        return rule["max"] if rule else None
+
+    def enabledrules(self):
+        """Return the mapping of rules enabled in yamllint's configuration to their configuration."""
+        return {rule: conf for (rule, conf) in self.conf.rules.items() if conf is not False}
+
+    def lint(self, content):
+        """Lint some content.
+
+        Returns the (linter's exitcode, list of problems) tuple,
+        with the exit code yamllint would return in strict mode.
+        """
+        problems = []
+        exitcode = 0
+        conf = self.conf
+        # Contents are linted the same way yamllint lints its stdin
+        for problem in self._linter.run(content, conf, ''):
+            problems.append((problem.line, problem.column, problem.level, problem.message))
+            if problem.level == "error":
+                exitcode = 1
+            elif not exitcode:
+                exitcode = 2
+        return (exitcode, problems)
+
+
+def getlinter(arguments):
+    """Return the linter to use depending on the command line arguments."""
+    backend = getattr(arguments, "backend", "auto")
+    if (backend == "auto") and getattr(arguments, "linter", None):
+        backend = "subprocess"
+    if backend != "subprocess":
+        try:
+            return InProcessLinter(arguments)
+        except ImportError:
+            if backend == "inprocess":
+                YAMLFixerBase(arguments).error("yamllint can't be imported, please ensure it's installed.")
+                sys.exit(EXIT_PROBLEM)
+    return SubprocessLinter(arguments)
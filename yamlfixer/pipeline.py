@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's Pipeline class."""
+
+import sys
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import YAMLFixerBase
+from .filefixer import FileFixer, fixfile, fixresults
+
+# Maximum number of files in the pipeline, per concurrent operation of each stage
+INFLIGHTPERSTAGE = 4
+
+# Marks the end of the results
+DONE = object()
+
+# Before Python 3.8, asyncio's subprocesses only work in the main thread's event loop
+ASYNCSUBPROCESSES = sys.version_info >= (3, 8)
+
+
+class Pipeline(YAMLFixerBase):
+    """To fix files through concurrent stages connected by bounded queues.
+
+    Files are read, linted, then fixed and written, each stage processing
+    up to --pipeline files at once, so that disk accesses and linting
+    overlap. The first linting of each file is done by an asynchronous
+    subprocess with the subprocess backend, starting with Python 3.8.
+    Results are produced in the same order as the files.
+    """
+
+    def __init__(self, arguments, linter, cache, configs=None):
+        """Initialize the pipeline."""
+        super().__init__(arguments)
+        self.linter = linter
+        self.cache = cache
+        self.configs = configs
+        self.concurrency = arguments.pipeline
+        self.executor = None
+
+    async def _inexecutor(self, function, *args):
+        """Run a blocking function in a thread and return its result."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def _feed(self, filenames, toread, inflight):
+        """Send the files to the reading stage, returning their number."""
+        filenames = iter(filenames)
+        index = 0
+        while True:
+            # Directories are scanned in a thread too
+            filename = await self._inexecutor(next, filenames, None)
+            if filename is None:
+                return index
+            await inflight.acquire()
+            await toread.put((index, filename))
+            index += 1
+
+    async def _read(self, toread, tolint, tofix):
+        """Load the files, sending those which need it to the linting stage."""
+        while True:
+            (index, filename) = await toread.get()
+            if filename == '-':
+                # stdin is entirely handled by the fixing stage
+                await tofix.put((index, filename, None))
+                continue
+            (linter, cache) = (self.linter, self.cache) if self.configs is None else self.configs.resolve(filename)
+            filetofix = FileFixer(self.arguments, filename, linter, cache)
+            await self._inexecutor(filetofix.load)
+            if (filetofix.incontents is None) or ((cache is not None) and (filetofix.incontents in cache)):
+                await tofix.put((index, filename, filetofix))
+            else:
+                await tolint.put((index, filename, filetofix))
+
+    async def _lint(self, tolint, tofix):
+        """Lint the files' original contents."""
+        while True:
+            (index, filename, filetofix) = await tolint.get()
+            start = time.perf_counter()
+            if ASYNCSUBPROCESSES and hasattr(filetofix.linter, "lintasync"):
+                filetofix.prelinted = await filetofix.linter.lintasync(filetofix.incontents)
+            else:
+                filetofix.prelinted = await self._inexecutor(filetofix.linter.lint, filetofix.incontents)
+            if filetofix.timings.enabled:
+                filetofix.timings.phases["lint"] += time.perf_counter() - start
+            await tofix.put((index, filename, filetofix))
+
+    def _fixone(self, filename, filetofix):
+        """Fix and write a file, and return its results."""
+        if filetofix is None:
+            return fixfile(self.arguments, self.linter, self.cache, filename, self.configs)
+        filetofix.debug(f"Fixing {filename} ... ")
+        return fixresults(filetofix, *filetofix.fixcontents())
+
+    async def _fix(self, tofix, fixed):
+        """Fix and write the files."""
+        while True:
+            (index, filename, filetofix) = await tofix.get()
+            try:
+                results = await self._inexecutor(self._fixone, filename, filetofix)
+            except asyncio.CancelledError:  # pylint: disable=try-except-raise
+                # An Exception before Python 3.8
+                raise
+            except (Exception, SystemExit) as exc:  # pylint: disable=broad-except
+                # Re-raised in filenames order
+                results = exc
+            await fixed.put((index, filename, results))
+
+    async def _emit(self, fixed, output, inflight, feeder, workers):
+        """Send the results to the output queue in filenames order."""
+        done = {}
+        nextindex = 0
+        while (not feeder.done()) or (nextindex < feeder.result()):
+            getter = asyncio.ensure_future(fixed.get())
+            await asyncio.wait((getter, feeder, *workers), return_when=asyncio.FIRST_COMPLETED)
+            for worker in workers:
+                if worker.done():
+                    # Workers only stop because of an exception, which is raised
+                    getter.cancel()
+                    worker.result()
+            if not getter.done():
+                # All files were sent to the pipeline
+                getter.cancel()
+                continue
+            (index, filename, results) = getter.result()
+            done[index] = (filename, results)
+            while nextindex in done:
+                (filename, results) = done.pop(nextindex)
+                if isinstance(results, BaseException):
+                    raise results
+                await self._inexecutor(output.put, (filename, results))
+                inflight.release()
+                nextindex += 1
+        feeder.result()
+
+    async def _run(self, filenames, output):
+        """Run the pipeline, sending the results then DONE or an exception to the output queue."""
+        self.executor = ThreadPoolExecutor(max_workers=3 * self.concurrency + 2)
+        inflight = asyncio.Semaphore(INFLIGHTPERSTAGE * self.concurrency)
+        (toread, tolint, tofix, fixed) = (asyncio.Queue(self.concurrency) for _ in range(4))
+        feeder = asyncio.ensure_future(self._feed(filenames, toread, inflight))
+        workers = []
+        for _ in range(self.concurrency):
+            workers.append(asyncio.ensure_future(self._read(toread, tolint, tofix)))
+            workers.append(asyncio.ensure_future(self._lint(tolint, tofix)))
+            workers.append(asyncio.ensure_future(self._fix(tofix, fixed)))
+        try:
+            await self._emit(fixed, output, inflight, feeder, workers)
+            result = DONE
+        except asyncio.CancelledError:  # pylint: disable=try-except-raise
+            # An Exception before Python 3.8
+            raise
+        except (Exception, SystemExit) as exc:  # pylint: disable=broad-except
+            result = exc
+        finally:
+            for task in workers + [feeder]:
+                task.cancel()
+            await asyncio.gather(*workers, feeder, return_exceptions=True)
+            self.executor.shutdown(wait=False)
+        # Nothing else runs anymore, so blocking is harmless
+        output.put(result)
+
+    def results(self, filenames):
+        """Generate the (filename, results) tuples, with fixfile()'s results, in filenames order."""
+        self.debug(f"Fixing files with a pipeline of {self.concurrency} concurrent operations per stage")
+        output = queue.Queue(self.concurrency)
+        thread = threading.Thread(target=asyncio.run, args=(self._run(filenames, output),), daemon=True)
+        thread.start()
+        while True:
+            result = output.get()
+            if result is DONE:
+                break
+            if isinstance(result, BaseException):
+                raise result
+            yield result
+        thread.join()
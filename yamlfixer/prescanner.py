@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's PreScanner class."""
+
+import re
+import string
+
+# Contents starting with a document start marker or a directive
+DOCSTART = re.compile(r"^(---|%)(\s|$)")
+
+
+class PreScanner:  # pylint: disable=too-few-public-methods
+    """To find purely textual problems without launching the linter.
+
+    Only the problems yamllint would report for the rules enabled in its
+    configuration are found, with the same positions and messages, so
+    that the usual fixers can fix them. Contents with directives in
+    comments which may disable rules, or with line boundaries other than
+    newlines, are never prescanned.
+    """
+
+    def __init__(self, rules):
+        """Initialize the prescanner with the mapping of yamllint's enabled rules to their configuration."""
+        self.rules = rules
+        self.checks = [getattr(self, f"_{rule.replace('-', '')}")
+                       for rule in ("document-start", "trailing-spaces", "empty-lines", "new-line-at-end-of-file")
+                       if rule in rules]
+
+    def _problem(self, linenumber, colnumber, message, rule):
+        """Return a problem the same way the linter reports it."""
+        return (linenumber, colnumber, self.rules[rule]["level"], f"{message} ({rule})")
+
+    def _documentstart(self, lines, _):
+        """Find a missing document start at the beginning of the contents."""
+        if not self.rules["document-start"]["present"]:
+            return
+        for (index, line) in enumerate(lines):
+            stripped = line.strip()
+            if stripped and not stripped.startswith('#'):
+                if (DOCSTART.match(line) is None) and not line.startswith("..."):
+                    yield self._problem(index + 1, 1, 'missing document start "---"', "document-start")
+                return
+
+    def _trailingspaces(self, lines, _):
+        """Find the lines ending with spaces or tabulations."""
+        for (index, line) in enumerate(lines):
+            stripped = line.rstrip(string.whitespace)
+            if (stripped != line) and (line[len(stripped)] in ' \t'):
+                yield self._problem(index + 1, len(stripped) + 1, "trailing spaces", "trailing-spaces")
+
+    def _emptylines(self, lines, endsinnewline):
+        """Find the series of blank lines which are too long."""
+        conf = self.rules["empty-lines"]
+        nblines = len(lines)
+        blanklines = 0
+        for (index, line) in enumerate(lines):
+            if line:
+                blanklines = 0
+                continue
+            blanklines += 1
+            if (index + 1 < nblines) and not lines[index + 1]:
+                # Only the last blank line of a series is reported
+                continue
+            if (index + 1 == nblines) and endsinnewline:
+                if nblines == 1:
+                    # A single newline is allowed
+                    continue
+                maxblanklines = conf["max-end"]
+            elif blanklines == index + 1:
+                maxblanklines = conf["max-start"]
+            else:
+                maxblanklines = conf["max"]
+            if blanklines > maxblanklines:
+                yield self._problem(index + 1, 1, f"too many blank lines ({blanklines} > {maxblanklines})",
+                                    "empty-lines")
+
+    def _newlineatendoffile(self, lines, endsinnewline):
+        """Find a missing newline at the end of the contents."""
+        if lines and lines[-1] and not endsinnewline:
+            yield self._problem(len(lines), len(lines[-1]) + 1, "no new line character at the end of file",
+                                "new-line-at-end-of-file")
+
+    def problems(self, yamltext):
+        """Return the list of problems found in some contents."""
+        if "yamllint disable" in yamltext:
+            return []
+        lines = yamltext.split('\n')
+        endsinnewline = yamltext.endswith('\n')
+        if endsinnewline:
+            del lines[-1]
+        if lines != yamltext.splitlines():
+            # Other line boundaries would shift line numbers
+            return []
+        problems = []
+        for check in self.checks:
+            problems.extend(check(lines, endsinnewline))
+        return sorted(problems)
@@ -18,45 +18,108 @@
 
 """yamlfixer's ProblemFixer class."""
 
+import re
+import time
+
 from .constants import FIXER_HANDLED, FIXER_UNHANDLED
 from .common import YAMLFixerBase
 
 
+# The rule reporting a problem, at the end of yamllint's message
+RULENAME = re.compile(r"\(([\w-]+)\)$")
+
+
+def mayintroduceproblems(method):
+    """Flag a fixer whose changes may introduce new problems, or not fix all of them."""
+    method.mayintroduceproblems = True
+    return method
+
+
+def usesdefaultvalues(method):
+    """Flag a fixer which only fixes its problems if their rules are configured with yamllint's default values."""
+    method.usesdefaultvalues = True
+    return method
+
+
 class ProblemFixer(YAMLFixerBase):
-    """To hold problem fixing logic."""
+    """To hold problem fixing logic.
 
+    A single ProblemFixer is used for all the problems of a given file.
+    """
+
+    # Mapping of problems to the names of the methods fixing them, and
+    # regular expression matching any of these problems, both built once
+    # at import time, see _builddispatcher() below.
     fixers = {}
+    dispatcher = None
 
-    def __init__(self, filefixer, linenum, colnum, problem):
+    def __init__(self, filefixer):
         """Intializes a problem fixer."""
         super().__init__(filefixer.arguments)
         self.ffixer = filefixer
-        self.linenum = linenum + self.ffixer.loffset - 1
+        self.linenum = self.colnum = 0
+        self.problem = None
+        self.methods = {}
+        for (prob, methodname) in self.fixers.items():
+            if (not prob.startswith("syntax error")) or (not self.arguments.nosyntax):
+                self.methods[prob] = getattr(self, methodname)
+
+    @classmethod
+    def _builddispatcher(cls):
+        """Build the mapping of problems to methods from their docstrings."""
+        for methodname in [m for m in dir(cls) if m.startswith('fix_')]:
+            docstring = getattr(cls, methodname).__doc__
+            for prob in [pb.strip()[2:] for pb in docstring.splitlines()[1:]]:
+                if prob:
+                    cls.fixers[prob] = methodname
+        # Longest problems first, so that the longest one matches
+        alternatives = sorted(cls.fixers, key=len, reverse=True)
+        cls.dispatcher = re.compile('|'.join(re.escape(prob) for prob in alternatives))
+
+    def __call__(self, linenum, colnum, problem):
+        """Fix a problem, and return FIXER_HANDLED or FIXER_UNHANDLED."""
+        # Lines are always addressed using their original line numbers
+        self.linenum = linenum - 1
         self.colnum = colnum + self.ffixer.coffset - 1
         self.problem = problem
-        if not self.fixers:
-            for methodname in [m for m in dir(self) if m.startswith('fix_')]:
-                docstring = getattr(self, methodname).__doc__
-                for prob in [pb.strip()[2:] for pb in docstring.splitlines()[1:]]:
-                    if prob and ((not prob.startswith("syntax error")) or (not self.arguments.nosyntax)):
-                        self.fixers[prob] = methodname
-
-    def __call__(self):
-        """Make it callable."""
         try:
             line = self.ffixer.lines[self.linenum]
         except IndexError:
             line = self.ffixer.lines[-1]
         left = line[:self.colnum]
         right = line[self.colnum:]
-        for (fixerkey, methodname) in self.fixers.items():
-            if self.problem.startswith(fixerkey):
-                self.debug(f'Calling {methodname}("{left}", "{right}")')
-                getattr(self, methodname)(left, right)
+        match = self.dispatcher.match(problem)
+        if match is not None:
+            method = self.methods.get(match.group())
+            if method is not None:
+                self.debug(f'Calling {method.__name__}("{left}", "{right}")')
+                if problem.startswith("syntax error") or getattr(method, "mayintroduceproblems", False) \
+                   or (getattr(method, "usesdefaultvalues", False) and not self._hasdefaultvalues(problem)):
+                    # yamllint stops at the first syntax error, so others may remain
+                    self.ffixer.mayintroduceproblems = True
+                timings = self.ffixer.timings
+                if timings.enabled:
+                    start = time.perf_counter()
+                    method(left, right)
+                    timings.addfixer(method.__name__, time.perf_counter() - start)
+                else:
+                    method(left, right)
                 return FIXER_HANDLED
         self.debug(f'No handler found for ("{left}", "{right}")')
         return FIXER_UNHANDLED
 
+    def _hasdefaultvalues(self, problem):
+        """Return True if the rule reporting a problem is known to use yamllint's default values, else False."""
+        enabledrules = getattr(self.ffixer.linter, "enabledrules", None)
+        match = RULENAME.search(problem)
+        if (enabledrules is None) or (match is None):
+            # yamllint's configuration is unknown
+            return False
+        from yamllint import rules  # pylint: disable=import-outside-toplevel
+        rulename = match.group(1)
+        conf = enabledrules().get(rulename, {})
+        return all(conf.get(option) == value for (option, value) in rules.get(rulename).DEFAULT.items())
+
     def _get_indentation(self, offset=0):
         """Return the indentation of the current (possibly offset) line."""
         lnum = self.linenum
@@ -91,23 +154,22 @@ class ProblemFixer(YAMLFixerBase):
              - syntax error: expected '<document start>', but found '<stream end>' (syntax)
         """  # noqa: D205, D208, D400
         self.ffixer.lines.insert(self.linenum, '---')
-        self.ffixer.loffset += 1
 
     def fix_missing_docend(self, left, right):  # pylint: disable=unused-argument
         """Fix:
              - missing document end
         """  # noqa: D205, D208, D400
         self.ffixer.lines.insert(self.linenum + 1, '...')
-        self.ffixer.loffset += 1
 
+    @mayintroduceproblems
     def fix_forbidden_docstartend(self, left, right):  # pylint: disable=unused-argument
         """Fix:
              - found forbidden document end
              - found forbidden document start
         """  # noqa: D205, D208, D400
         del self.ffixer.lines[self.linenum]
-        self.ffixer.loffset -= 1
 
+    @mayintroduceproblems
     def fix_newlineateof(self, left, right):  # pylint: disable=unused-argument,no-self-use
         r"""Fix:
              - no new line character at the end of file
@@ -116,7 +178,6 @@ class ProblemFixer(YAMLFixerBase):
         if not (left or right):
             # We came here because last line contained only trailing spaces
             del self.ffixer.lines[self.linenum]
-            self.ffixer.loffset -= 1
 
         # Else we simply ignore it, because we always add \n when dumping
         # and rely on universal newlines to handle them correctly.
@@ -144,6 +205,7 @@ class ProblemFixer(YAMLFixerBase):
                 self.ffixer.coffset += len('false') - len(falseval)
                 return
 
+    @usesdefaultvalues
     def fix_toofew_spacesbefore(self, left, right):
         """Fix:
              - too few spaces before comment (comments)
@@ -161,6 +223,9 @@ class ProblemFixer(YAMLFixerBase):
         """  # noqa: D205, D208, D400
         # No need to adjust coffset because we are at EOL by definition
         self.ffixer.lines[self.linenum] = (left + right).rstrip()
+        if not self.ffixer.lines[self.linenum]:
+            # There might be too many blank lines now
+            self.ffixer.mayintroduceproblems = True
 
     def fix_toomany_blanklines(self, left, right):  # pylint: disable=unused-argument
         """Fix:
@@ -171,7 +236,6 @@ class ProblemFixer(YAMLFixerBase):
         maxblanklines = int(parts[6].split(')')[0])
         nblines = blanklines - maxblanklines
         del self.ffixer.lines[self.linenum - nblines + 1:self.linenum + 1]
-        self.ffixer.loffset -= nblines
 
     def fix_syntax_tabchar(self, left, right):  # pylint: disable=unused-argument
         r"""Fix:
@@ -190,6 +254,7 @@ class ProblemFixer(YAMLFixerBase):
         self.ffixer.lines[lnum] = self.ffixer.lines[lnum] + ':'
         # No need to adjust coffset because we are at EOL by definition
 
+    @usesdefaultvalues
     def fix_missingspace(self, left, right):
         """Fix:
              - missing starting space in comment (comments)
@@ -202,6 +267,7 @@ class ProblemFixer(YAMLFixerBase):
         self.ffixer.lines[self.linenum] = left + spaces + right
         self.ffixer.coffset += len(spaces)
 
+    @usesdefaultvalues
     def fix_toomany_spacesafter(self, left, right):
         """Fix:
              - too many spaces after colon (colons)
@@ -215,6 +281,7 @@ class ProblemFixer(YAMLFixerBase):
         self.ffixer.lines[self.linenum] = left[:pos] + right
         self.ffixer.coffset -= (self.colnum - pos)
 
+    @usesdefaultvalues
     def fix_toomany_spacesother(self, left, right):
         """Fix:
              - too many spaces inside braces (braces)
@@ -230,6 +297,7 @@ class ProblemFixer(YAMLFixerBase):
         self.ffixer.lines[self.linenum] = left[:pos] + right[1:]
         self.ffixer.coffset -= (self.colnum - pos + 1)
 
+    @mayintroduceproblems
     def fix_comment_notindentedlike(self, left, right):
         """Fix:
              - comment not indented like content (comments-indentation)
@@ -244,6 +312,7 @@ class ProblemFixer(YAMLFixerBase):
         self.ffixer.lines[self.linenum] = ' ' * indentation + (left + right).lstrip()
         self.ffixer.coffset += (indentation - self.colnum)
 
+    @mayintroduceproblems
     def fix_wrong_indentation(self, left, right):
         """Fix:
              - wrong indentation: expected
@@ -263,6 +332,7 @@ class ProblemFixer(YAMLFixerBase):
             self.ffixer.lines[self.linenum] = (left + right)[-offset:]
         self.ffixer.coffset += offset
 
+    @mayintroduceproblems
     def fix_linetoolong(self, left, right):  # pylint: disable=unused-argument
         """Fix:
              - line too long
@@ -270,8 +340,8 @@ class ProblemFixer(YAMLFixerBase):
         # TODO: currently we fix this by disabling the error in yamllint, it's the easiest way
         self.ffixer.lines.insert(self.linenum, ' ' * self._get_indentation()
                                  + '# yamllint disable-line rule:line-length')
-        self.ffixer.loffset += 1
 
+    @mayintroduceproblems
     def fix_syntax_mappingvalues_nah(self, left, right):
         """Fix:
              - syntax error: mapping values are not allowed here
@@ -290,3 +360,6 @@ class ProblemFixer(YAMLFixerBase):
                 previndentation += 1
         self.ffixer.lines[self.linenum] = ' ' * previndentation + (left + right).lstrip()
         self.ffixer.coffset += previndentation - indentation
+
+
+ProblemFixer._builddispatcher()  # pylint: disable=protected-access
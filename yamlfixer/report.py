@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's problems reports."""
+
+import re
+import json
+
+from . import __version__
+
+# yamllint's messages end with the rule's name, syntax errors excepted
+RULEINMESSAGE = re.compile(r"^(.*) \(([\w-]+)\)$")
+
+# Rule of the problems which don't have any
+NORULE = "syntax"
+
+SARIFSCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+RULESURI = "https://yamllint.readthedocs.io/en/stable/rules.html"
+
+# SARIF's kind of result for each outcome
+SARIFKINDS = {"handled": "pass",
+              "unhandled": "informational",
+              "remaining": "fail"}
+
+
+def reportentry(problem, outcome, nbpass=None):
+    """Return a report's entry for a linter's problem.
+
+    outcome is either "handled" or "unhandled" by a fixer during
+    the pass numbered nbpass, or "remaining" once fixed.
+    """
+    (linenumber, colnumber, level, msg) = problem
+    match = RULEINMESSAGE.match(msg)
+    (message, rule) = match.groups() if match is not None else (msg, NORULE)
+    entry = {"line": linenumber,
+             "column": colnumber,
+             "level": level,
+             "rule": rule,
+             "message": message,
+             "outcome": outcome}
+    if nbpass is not None:
+        entry["pass"] = nbpass
+    return entry
+
+
+class JSONLinesReport:
+    """To write a report with a JSON record for each problem, each on its own line."""
+
+    def __init__(self, reportfile):
+        """Initialize the report."""
+        self.reportfile = reportfile
+
+    def add(self, filename, entries):
+        """Add a file's entries to the report."""
+        for entry in entries:
+            self.reportfile.write(f"{json.dumps({'filename': filename, **entry})}\n")
+
+    def close(self):
+        """Finish the report."""
+
+
+class SarifReport:
+    """To write a SARIF report, one result at a time."""
+
+    def __init__(self, reportfile):
+        """Initialize the report."""
+        self.reportfile = reportfile
+        self.rules = set()
+        self.separator = ""
+        self.reportfile.write(f'{{"$schema": {json.dumps(SARIFSCHEMA)}, "version": "2.1.0", '
+                              '"runs": [{"results": [')
+
+    def add(self, filename, entries):
+        """Add a file's entries to the report."""
+        uri = filename.replace('\\', '/')
+        for entry in entries:
+            self.rules.add(entry["rule"])
+            kind = SARIFKINDS[entry["outcome"]]
+            result = {"ruleId": entry["rule"],
+                      "kind": kind,
+                      "level": entry["level"] if kind == "fail" else "none",
+                      "message": {"text": entry["message"]},
+                      "locations": [{"physicalLocation": {"artifactLocation": {"uri": uri},
+                                                          "region": {"startLine": entry["line"],
+                                                                     "startColumn": entry["column"]}}}],
+                      "properties": {key: entry[key] for key in ("outcome", "pass") if key in entry}}
+            self.reportfile.write(f"{self.separator}\n{json.dumps(result)}")
+            self.separator = ","
+
+    def close(self):
+        """Finish the report with the tool's description."""
+        rules = [{"id": rule,
+                  "helpUri": f"{RULESURI}#module-yamllint.rules.{rule.replace('-', '_')}"}
+                 for rule in sorted(self.rules) if rule != NORULE]
+        driver = {"name": "yamlfixer",
+                  "version": __version__,
+                  "informationUri": "https://github.com/opt-nc/yamlfixer",
+                  "rules": rules}
+        self.reportfile.write(f'\n], "tool": {{"driver": {json.dumps(driver)}}}}}]}}\n')
+
+
+REPORTS = {"sarif": SarifReport,
+           "jsonlines": JSONLinesReport}
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's Scanner class."""
+
+import os
+import sys
+from fnmatch import fnmatch
+from contextlib import suppress
+
+from .constants import EXIT_PROBLEM
+from .common import YAMLFixerBase
+
+# Directories never worth scanning when ignore rules are honoured
+IGNOREDDIRS = (".git",)
+
+
+def sortkey(name, isdir):
+    """Return the key sorting names in a directory the same way as the paths below it."""
+    return f"{name}{os.sep}" if isdir else name
+
+
+class Scanner(YAMLFixerBase):
+    """To find YAML files in directories.
+
+    Directories are scanned iteratively, possibly several at once,
+    and files are generated as soon as they are found, in the order
+    of their sorted paths.
+    """
+
+    def __init__(self, arguments, linter=None):
+        """Initialize the scanner."""
+        super().__init__(arguments)
+        self.extensions = [f".{e.strip()}" for e in self.arguments.ext.split(",")]
+        self.excludes = self.arguments.exclude or []
+        self.linter = linter
+        self.pathspec = None
+        self.yamllintconf = None
+        self.ignoresloaded = False
+
+    def _loadignores(self):
+        """Load what's needed to honour ignore rules, the first time something is scanned."""
+        if self.ignoresloaded or self.arguments.noignore:
+            return
+        self.ignoresloaded = True
+        try:
+            import pathspec  # pylint: disable=import-outside-toplevel
+            self.pathspec = pathspec
+        except ImportError:
+            self.debug("pathspec can't be imported, .gitignore files will be ignored")
+        self.yamllintconf = getattr(self.linter, "conf", None)
+
+    def _matchesext(self, filename):
+        """Return True if filename matches the set of extensions, else False."""
+        return any(filename.endswith(ext) for ext in self.extensions)
+
+    def _isexcluded(self, path, isdir, specs):
+        """Return True if a path is excluded, else False."""
+        name = os.path.basename(path)
+        if any(fnmatch(path, glob) or fnmatch(name, glob) for glob in self.excludes):
+            return True
+        if self.arguments.noignore:
+            return False
+        if isdir and (name in IGNOREDDIRS):
+            return True
+        suffix = '/' if isdir else ''
+        for (basedir, spec) in specs:
+            if spec.match_file(os.path.relpath(path, basedir) + suffix):
+                return True
+        return bool(self.yamllintconf
+                    and self.yamllintconf.is_file_ignored(os.path.normpath(path) + suffix))
+
+    def _readgitignore(self, path):
+        """Return the patterns from a directory's .gitignore file, or None."""
+        if self.pathspec is None:
+            return None
+        with suppress(OSError, UnicodeDecodeError), \
+                open(os.path.join(path, ".gitignore"), 'r', encoding='utf-8') as gitignore:
+            if hasattr(self.pathspec, "GitIgnoreSpec"):
+                return self.pathspec.GitIgnoreSpec.from_lines(gitignore)
+            return self.pathspec.PathSpec.from_lines("gitwildmatch", gitignore)
+        return None
+
+    def _listdir(self, path, level, specs):
+        """List a directory.
+
+        Returns the sorted list of (name, path, is a directory, level, specs)
+        tuples for the matching files and the subdirectories to scan.
+        """
+        self.debug(f"SCAN [{path}] at level {level} with limit {self.arguments.recurse}")
+        spec = self._readgitignore(path)
+        if spec is not None:
+            specs = specs + [(path, spec)]
+        entries = []
+        descend = (self.arguments.recurse < 0) or (level < self.arguments.recurse)
+        with suppress(PermissionError, FileNotFoundError, NotADirectoryError), os.scandir(path) as dircontents:
+            for entry in dircontents:
+                if entry.is_file() and self._matchesext(entry.name):
+                    if not self._isexcluded(entry.path, False, specs):
+                        entries.append((entry.name, entry.path, False, level, specs))
+                elif (descend
+                      and entry.is_dir(follow_symlinks=self.arguments.followsymlinks)
+                      and not self._isexcluded(entry.path, True, specs)):
+                    entries.append((entry.name, entry.path, True, level + 1, specs))
+        entries.sort(key=lambda entry: sortkey(entry[0], entry[2]))
+        return entries
+
+    def scan(self, path):
+        """Generate the YAML files found in a directory, recursively."""
+        self._loadignores()
+        from concurrent.futures import ThreadPoolExecutor  # pylint: disable=import-outside-toplevel
+        jobs = self.arguments.jobs or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # The stack contains either files or the future listings of directories,
+            # whose scanning is started as soon as their parent directory is listed.
+            stack = [(path, executor.submit(self._listdir, path, 0, []))]
+            while stack:
+                (entrypath, listing) = stack.pop()
+                if listing is None:
+                    yield entrypath
+                else:
+                    for (_, subpath, isdir, level, specs) in reversed(listing.result()):
+                        if isdir:
+                            stack.append((subpath, executor.submit(self._listdir, subpath, level, specs)))
+                        else:
+                            stack.append((subpath, None))
+
+    def _ancestors(self, root, path):
+        """Generate the (directory, level, specs) tuples scan(root) uses to list each directory above path."""
+        specs = []
+        directory = root
+        for (level, part) in enumerate(os.path.relpath(path, root).split(os.sep)):
+            spec = self._readgitignore(directory)
+            if spec is not None:
+                specs = specs + [(directory, spec)]
+            yield (directory, level, specs)
+            directory = os.path.join(directory, part)
+
+    def accepts(self, root, path):
+        """Return True if scan(root) would find a file or search a directory, else False."""
+        self._loadignores()
+        relpath = os.path.relpath(path, root)
+        if relpath.startswith(os.pardir) or (relpath == os.curdir):
+            return False
+        parts = relpath.split(os.sep)
+        isdir = os.path.isdir(path)
+        if (not isdir) and not self._matchesext(parts[-1]):
+            return False
+        for (directory, level, specs) in self._ancestors(root, path):
+            subpath = os.path.join(directory, parts[level])
+            subisdir = isdir or (level < len(parts) - 1)
+            if subisdir and (0 <= self.arguments.recurse <= level):
+                return False
+            if self._isexcluded(subpath, subisdir, specs):
+                return False
+        return True
+
+    def directories(self, root, path=None):
+        """Generate a directory below root, root by default, and the subdirectories scan(root) would search."""
+        self._loadignores()
+        (level, specs) = (0, [])
+        if (path is not None) and (os.path.relpath(path, root) != os.curdir):
+            # The parent directory's specs apply, path being listed one level deeper
+            *_, (_, parentlevel, specs) = self._ancestors(root, path)
+            level = parentlevel + 1
+        stack = [(path or root, level, specs)]
+        while stack:
+            (directory, dirlevel, dirspecs) = stack.pop()
+            yield directory
+            for (_, subpath, isdir, sublevel, subspecs) in reversed(self._listdir(directory, dirlevel, dirspecs)):
+                if isdir:
+                    stack.append((subpath, sublevel, subspecs))
+
+    def _git(self, subcommand, *gitarguments):
+        """Return the list of paths output by a git command."""
+        import subprocess  # pylint: disable=import-outside-toplevel
+        command = ["git", subcommand, "-z", *gitarguments]
+        self.debug(f"Executing {repr(command)}")
+        try:
+            git = subprocess.run(command, capture_output=True, check=True, text=True, encoding='utf-8')
+        except FileNotFoundError:
+            self.error("git is not in your PATH, please ensure it's installed.")
+            sys.exit(EXIT_PROBLEM)
+        except subprocess.CalledProcessError as msg:
+            self.error(f"{msg.stderr.strip() or msg}")
+            sys.exit(EXIT_PROBLEM)
+        return [path for path in git.stdout.split('\0') if path]
+
+    def changed(self, fnames):
+        """Generate the YAML files changed in the git repository, relative to the current directory.
+
+        Only files which are in the fnames list, or below one of its directories,
+        are generated. All changed files are generated if fnames is empty.
+        """
+        self._loadignores()
+        if self.arguments.staged:
+            changed = self._git("diff", "--cached", "--name-only", "--diff-filter=d", "--relative")
+        else:
+            changed = self._git("diff", "--name-only", "--diff-filter=d", "--relative",
+                                self.arguments.changedsince, "--")
+            # Untracked files differ from any revision too
+            changed.extend(self._git("ls-files", "--others", "--exclude-standard"))
+        changed = sorted(path for path in set(changed)
+                         if self._matchesext(os.path.basename(path)) and not self._isexcluded(path, False, []))
+        if not fnames:
+            yield from changed
+            return
+        for name in sorted(fnames):
+            absname = os.path.abspath(name)
+            if os.path.isdir(name):
+                for path in changed:
+                    relpath = os.path.relpath(os.path.abspath(path), absname)
+                    if (not relpath.startswith(os.pardir)) \
+                       and ((self.arguments.recurse < 0) or (relpath.count(os.sep) <= self.arguments.recurse)):
+                        yield path
+            elif any(os.path.abspath(path) == absname for path in changed):
+                yield name
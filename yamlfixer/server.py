@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's FixServer class."""
+
+import os
+import sys
+import stat
+import json
+import socket
+import argparse
+import threading
+import socketserver
+
+from .constants import EXIT_OK, EXIT_PROBLEM
+from .common import YAMLFixerBase
+from .filefixer import FileFixer, syncdirectories
+from .linter import getlinter
+from .cache import FixCache
+from .configs import ConfigResolver
+from .yamlfixer import STATUSES
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """To handle a client's connection, which sends one JSON request per line."""
+
+    def handle(self):
+        """Answer each request with a JSON response on a single line."""
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("a JSON object is expected")
+            except ValueError as msg:
+                response = {"error": f"invalid request : {msg}"}
+            else:
+                response = self.server.fixserver.process(request)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class FixServer(YAMLFixerBase):
+    """To fix files on behalf of clients connected to a Unix socket.
+
+    The linter, its configuration and the fixers are loaded only once,
+    so that each request only costs the fixing itself.
+
+    Requests are JSON objects, each on its own line, with these keys :
+
+      - command : either "fix" (the default) or "shutdown"
+      - path : the absolute path of a file to fix
+      - content : the contents to fix, in which case path is only used in
+        the diff, and to find yamllint's configuration with --nestedconfig
+      - nochange : don't modify the file if true
+
+    Responses are JSON objects, each on its own line, with either an
+    "error" key, or the "status", "content", "diff", "issues" and
+    "handled" keys.
+    """
+
+    def __init__(self, arguments):
+        """Initialize the server, loading the linter's configuration."""
+        super().__init__(arguments)
+        self.linter = getlinter(arguments)
+        self.cache = None if arguments.nocache else FixCache(arguments)
+        self.configs = ConfigResolver(arguments) if arguments.nestedconfig else None
+        self.nochangearguments = argparse.Namespace(**dict(vars(arguments), nochange=True))
+        self.server = None
+
+    def process(self, request):
+        """Process a request and return the response."""
+        command = request.get("command", "fix")
+        if command == "shutdown":
+            self.info("Shutdown requested by client")
+            threading.Thread(target=self.server.shutdown).start()
+            return {}
+        if command != "fix":
+            return {"error": f"unknown command {repr(command)}"}
+        path = request.get("path")
+        content = request.get("content")
+        if not all(isinstance(value, str) for value in (path, content) if value is not None):
+            return {"error": "path and content must be strings"}
+        if (content is None) and not path:
+            return {"error": "either path or content is needed"}
+        try:
+            return self._fix(path, content, request.get("nochange"))
+        except (Exception, SystemExit) as msg:  # pylint: disable=broad-except
+            # Only this request fails, the server and the connection go on
+            return {"error": f"impossible to fix {path or '<stdin>'} : {msg}"}
+
+    def _fix(self, path, content, nochange):
+        """Fix a file or some contents, and return the response."""
+        if (self.configs is None) or not path:
+            (linter, cache) = (self.linter, self.cache)
+        else:
+            (linter, cache) = self.configs.resolve(path)
+        if content is None:
+            arguments = self.nochangearguments if nochange else self.arguments
+            filefixer = FileFixer(arguments, path, linter, cache)
+            filefixer.wantsdiff = True
+            filefixer.debug(f"Fixing {path} ... ")
+            (status, unidiff) = filefixer.fix()
+            if filefixer.writtendir is not None:
+                syncdirectories(arguments, [filefixer.writtendir])
+        else:
+            # Contents are never written anywhere, only sent back
+            filefixer = FileFixer(self.nochangearguments, path or "<stdin>", linter, cache)
+            filefixer.wantsdiff = True
+            filefixer.debug(f"Fixing {path or '<stdin>'} contents ... ")
+            filefixer.incontents = content
+            (status, unidiff) = filefixer.fixcontents()
+        return {"status": STATUSES.get(status, {"counter": "unknown"})["counter"],
+                "content": filefixer.outcontents,
+                "diff": ''.join(unidiff),
+                "issues": filefixer.issues,
+                "handled": filefixer.issueshandled}
+
+    def _removestalesocket(self):
+        """Remove the socket file if no server listens to it anymore, else exit."""
+        socketpath = self.arguments.serve
+        try:
+            if not stat.S_ISSOCK(os.stat(socketpath).st_mode):
+                self.error(f"{socketpath} exists and is not a socket")
+                sys.exit(EXIT_PROBLEM)
+        except FileNotFoundError:
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:  # pylint: disable=no-member
+            try:
+                probe.connect(socketpath)
+            except OSError:
+                self.debug(f"Removing stale socket {socketpath}")
+                os.remove(socketpath)
+                return
+        self.error(f"another server already listens to {socketpath}")
+        sys.exit(EXIT_PROBLEM)
+
+    def serve(self):
+        """Serve requests until shutdown."""
+        if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+            self.error("server mode needs Unix sockets, which are not available on this platform.")
+            return EXIT_PROBLEM
+        socketpath = self.arguments.serve
+        self._removestalesocket()
+        # Only the current user can connect to the socket
+        oldumask = os.umask(0o177)
+        try:
+            self.server = socketserver.ThreadingUnixStreamServer(socketpath,  # pylint: disable=no-member
+                                                                 RequestHandler)
+        except OSError as msg:
+            self.error(f"impossible to listen to {socketpath} : {msg}")
+            return EXIT_PROBLEM
+        finally:
+            os.umask(oldumask)
+        self.server.daemon_threads = True
+        self.server.fixserver = self
+        if self.cache is not None:
+            self.cache.evict()
+        self.info(f"Listening to {socketpath}")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            self.info("\nInterrupted at user's request.")
+        finally:
+            self.server.server_close()
+            os.remove(socketpath)
+        return EXIT_OK
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's Timings class."""
+
+import time
+from contextlib import contextmanager, nullcontext
+
+# Processing phases, in the order they happen
+PHASES = ("discovery", "lint", "fix", "relint", "diff", "write")
+
+
+class Timings:
+    """To accumulate the durations of processing phases and fixers.
+
+    When disabled, nothing is measured and the overhead is negligible.
+    """
+
+    def __init__(self, enabled=True):
+        """Initialize empty timings."""
+        self.enabled = enabled
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        # Mapping of fixers' names to [number of calls, duration] lists
+        self.fixers = {}
+
+    @contextmanager
+    def _measure(self, phase):
+        """Add the duration of the managed block to a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] += time.perf_counter() - start
+
+    def phase(self, phase):
+        """Return a context manager measuring a phase, if enabled."""
+        if self.enabled:
+            return self._measure(phase)
+        return nullcontext()
+
+    def addfixer(self, name, duration):
+        """Account for a call to a fixer."""
+        counters = self.fixers.setdefault(name, [0, 0.0])
+        counters[0] += 1
+        counters[1] += duration
+
+    def merge(self, other):
+        """Add timings, either a Timings instance or its asdict() output."""
+        if isinstance(other, Timings):
+            other = other.asdict()
+        for (phase, duration) in other["phases"].items():
+            self.phases[phase] = self.phases.get(phase, 0.0) + duration
+        for (name, counters) in other["fixers"].items():
+            mycounters = self.fixers.setdefault(name, [0, 0.0])
+            mycounters[0] += counters["calls"]
+            mycounters[1] += counters["seconds"]
+
+    def asdict(self):
+        """Return the timings as a JSON serializable mapping."""
+        return {"phases": dict(self.phases),
+                "fixers": {name: {"calls": calls, "seconds": seconds}
+                           for (name, (calls, seconds)) in sorted(self.fixers.items())}}
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2021-2022 OPT-NC
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""yamlfixer's Watcher class."""
+
+import os
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+from contextlib import suppress
+
+from .constants import EXIT_OK
+from .common import YAMLFixerBase
+from .scanner import Scanner
+
+# Changes are only fixed once no other change happened for this long
+DEBOUNCEDELAY = 0.2
+
+# Delay between two checks when polling
+POLLINTERVAL = 1.0
+
+# inotify's constants, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+INOTIFYMASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+INOTIFYEVENT = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """To be notified of changes by Linux's inotify.
+
+    Raises OSError if inotify is not available.
+    """
+
+    name = "inotify"
+
+    def __init__(self):
+        """Initialize an inotify instance."""
+        libcname = ctypes.util.find_library("c")
+        if libcname is None:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libcname, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        # Mapping of watch descriptors to directories
+        self.watches = {}
+
+    def add(self, directory):
+        """Watch a directory, which may already be watched."""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), INOTIFYMASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def changes(self, timeout):
+        """Wait for changes at most timeout seconds, or forever if None.
+
+        Returns the set of changed files and directories.
+        """
+        changed = set()
+        (readable, _, _) = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return changed
+        with suppress(BlockingIOError):
+            while True:
+                buffer = os.read(self.fd, 65536)
+                offset = 0
+                while offset < len(buffer):
+                    (wd, mask, _, length) = INOTIFYEVENT.unpack_from(buffer, offset)
+                    offset += INOTIFYEVENT.size
+                    name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+                    offset += length
+                    if mask & IN_Q_OVERFLOW:
+                        # Events were lost, so everything may have changed
+                        changed.update(self.watches.values())
+                    elif mask & IN_IGNORED:
+                        self.watches.pop(wd, None)
+                    elif (wd in self.watches) and ((mask & IN_ISDIR) or not mask & IN_CREATE):
+                        # A created file is only changed once closed
+                        changed.add(os.path.join(self.watches[wd], name))
+        return changed
+
+
+class PollingBackend:
+    """To find changes by regularly checking the watched directories."""
+
+    name = "polling"
+
+    def __init__(self):
+        """Initialize the polling."""
+        # Mapping of directories to mappings of their entries to their signatures
+        self.snapshots = {}
+
+    @staticmethod
+    def _snapshot(directory):
+        """Return the mapping of a directory's entries to their signatures, or None."""
+        try:
+            with os.scandir(directory) as entries:
+                return {entry.path: signature(entry.path) for entry in entries}
+        except OSError:
+            return None
+
+    def add(self, directory):
+        """Watch a directory, which may already be watched."""
+        snapshot = self._snapshot(directory)
+        if snapshot is not None:
+            self.snapshots[directory] = snapshot
+
+    def changes(self, timeout):
+        """Wait timeout seconds, or POLLINTERVAL if None, then check for changes.
+
+        Returns the set of changed files and directories.
+        """
+        time.sleep(POLLINTERVAL if timeout is None else timeout)
+        changed = set()
+        for (directory, snapshot) in list(self.snapshots.items()):
+            newsnapshot = self._snapshot(directory)
+            if newsnapshot is None:
+                # Removed
+                del self.snapshots[directory]
+                continue
+            for (path, sign) in newsnapshot.items():
+                # Files created in watched directories are reported by themselves
+                if (snapshot.get(path) != sign) and (path not in self.snapshots):
+                    changed.add(path)
+            self.snapshots[directory] = newsnapshot
+        return changed
+
+
+def signature(path):
+    """Return a signature which changes each time a file is written, or None."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class Watcher(YAMLFixerBase):
+    """To fix files again each time they are created or modified."""
+
+    def __init__(self, yfixer):
+        """Initialize the watcher of the files a YAMLFixer fixes."""
+        super().__init__(yfixer.arguments)
+        self.yfixer = yfixer
+        # The fixed files are found in the summary's details
+        self.yfixer.keepdetails = True
+        self.yfixer.prepare()
+        self.scanner = Scanner(self.arguments, self.yfixer.linter)
+        self.roots = []
+        self.files = set()
+        for name in self.arguments.filenames:
+            if os.path.isdir(name):
+                self.roots.append(name)
+            elif os.path.isfile(name):
+                self.files.add(os.path.abspath(name))
+        # Signatures of the files once fixed, indexed by absolute
+        # paths, to ignore the changes we make ourselves
+        self.written = {}
+        try:
+            self.backend = InotifyBackend()
+        except OSError as msg:
+            self.debug(f"inotify can't be used : {msg}")
+            self.backend = PollingBackend()
+        self.debug(f"Watching changes with the {self.backend.name} backend")
+
+    def _watch(self, root, directory=None):
+        """Watch a directory below root, and its subdirectories to be searched.
+
+        Returns the set of files found in these directories.
+        """
+        found = set()
+        for subdir in self.scanner.directories(root, directory):
+            self.backend.add(subdir)
+            with suppress(OSError), os.scandir(subdir) as entries:
+                found.update(entry.path for entry in entries if entry.is_file())
+        return found
+
+    def _accepts(self, path):
+        """Return True if a file has to be fixed, else False."""
+        if os.path.abspath(path) in self.files:
+            return True
+        return any(self.scanner.accepts(root, path) for root in self.roots)
+
+    def _tofix(self, changed):
+        """Return the sorted list of changed files to fix."""
+        tofix = set()
+        for path in changed:
+            if os.path.isdir(path):
+                for root in self.roots:
+                    if (path == root) or self.scanner.accepts(root, path):
+                        tofix.update(self._watch(root, path))
+            else:
+                tofix.add(path)
+        return sorted(path for path in tofix
+                      if os.path.isfile(path)
+                      and (signature(path) != self.written.get(os.path.abspath(path)))
+                      and self._accepts(path))
+
+    def _fix(self, filenames=None):
+        """Fix files, remembering their signatures once fixed."""
+        self.yfixer.fix(filenames)
+        for filename in self.yfixer.summary["details"]:
+            self.written[os.path.abspath(filename)] = signature(filename)
+
+    def watch(self):
+        """Fix all files, then watch and fix them again each time they change."""
+        for root in self.roots:
+            self._watch(root)
+        for filename in self.files:
+            self.backend.add(os.path.dirname(filename))
+        self._fix()
+        self.info("Watching for changes, press Ctrl+C to stop.")
+        pending = set()
+        try:
+            while True:
+                changed = self.backend.changes(DEBOUNCEDELAY if pending else None)
+                if changed:
+                    pending.update(changed)
+                elif pending:
+                    filenames = self._tofix(pending)
+                    pending.clear()
+                    if filenames:
+                        self._fix(filenames)
+        except KeyboardInterrupt:
+            self.info("\nInterrupted at user's request.")
+        return EXIT_OK
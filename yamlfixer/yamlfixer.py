@@ -19,15 +19,19 @@
 """yamlfixer's main class."""
 
 import os
-import json
+import time
 from contextlib import suppress
+from collections import deque
 
 from . import __version__
 from .constants import FIX_PASSEDLINTER, FIX_MODIFIED, FIX_FIXED, FIX_SKIPPED, FIX_PERMERROR
 from .constants import EXIT_OK, EXIT_NOK
 from .common import YAMLFixerBase
-from .filefixer import FileFixer
-from .problemfixer import ProblemFixer
+from .filefixer import FileFixer, syncdirectories, fixfile, fixresults
+from .linter import getlinter
+from .cache import FixCache
+from .scanner import Scanner, sortkey
+from .timings import Timings, PHASES
 
 STATUSES = {FIX_PASSEDLINTER: {"msg": "passed linter's strict mode",
                                "counter": "passed",
@@ -45,6 +49,71 @@ STATUSES = {FIX_PASSEDLINTER: {"msg": "passed linter's strict mode",
                             "counter": "notwritable",
                             "color": "red"}}
 
+# Maximum number of files submitted but not yet fixed, per worker process
+PENDINGPERJOB = 4
+
+# Per worker process state, see _initworker()
+WORKERSTATE = {}
+
+
+def _initworker(arguments):
+    """Initialize a worker process with its own linter."""
+    WORKERSTATE["arguments"] = arguments
+    WORKERSTATE["linter"] = getlinter(arguments)
+    WORKERSTATE["cache"] = None if arguments.nocache else FixCache(arguments)
+    if arguments.nestedconfig:
+        from .configs import ConfigResolver  # pylint: disable=import-outside-toplevel
+        WORKERSTATE["configs"] = ConfigResolver(arguments)
+    else:
+        WORKERSTATE["configs"] = None
+
+
+def fixfiles(arguments, linter, cache, filenames, configs=None):
+    """Fix several files, linting them with a single linter command per configuration if possible.
+
+    Returns the list of fixfile()'s results for each file, in the same order.
+    """
+    if (len(filenames) == 1) or not hasattr(linter, "lintfiles"):
+        return [fixfile(arguments, linter, cache, filename, configs) for filename in filenames]
+    filestofix = []
+    # Mapping of linters to the files to lint with them
+    tolint = {}
+    for filename in filenames:
+        (filelinter, filecache) = (linter, cache) if configs is None else configs.resolve(filename)
+        filetofix = FileFixer(arguments, filename, filelinter, filecache)
+        filetofix.load()
+        filestofix.append(filetofix)
+        if (filetofix.incontents is not None) and ((filecache is None) or (filetofix.incontents not in filecache)):
+            tolint.setdefault(filelinter, []).append(filetofix)
+    for (filelinter, lintedtogether) in tolint.items():
+        _lintfiles(filelinter, lintedtogether)
+    results = []
+    for filetofix in filestofix:
+        filetofix.debug(f"Fixing {filetofix.filename} ... ")
+        results.append(fixresults(filetofix, *filetofix.fixcontents()))
+    return results
+
+
+def _lintfiles(linter, filestofix):
+    """Lint files with a single linter command, their FileFixers keeping the results.
+
+    The time spent is shared between all files.
+    """
+    start = time.perf_counter()
+    lintresults = linter.lintfiles([filetofix.filename for filetofix in filestofix])
+    duration = (time.perf_counter() - start) / len(filestofix)
+    for filetofix in filestofix:
+        if lintresults is not None:
+            filetofix.prelinted = lintresults[filetofix.filename]
+        if filetofix.timings.enabled:
+            filetofix.timings.phases["lint"] += duration
+
+
+def _fixfiles(filenames):
+    """Fix several files from within a worker process."""
+    return fixfiles(WORKERSTATE["arguments"], WORKERSTATE["linter"], WORKERSTATE["cache"], filenames,
+                    WORKERSTATE["configs"])
+
 
 class YAMLFixer(YAMLFixerBase):
     """To hold files fixing logic."""
@@ -54,9 +123,16 @@ class YAMLFixer(YAMLFixerBase):
         super().__init__(arguments)
         self.debug(f"yamlfixer v{__version__}")
         self.debug(f"arguments={repr(arguments)}")
-        self.extensions = [f".{e.strip()}" for e in self.arguments.ext.split(",")]
-        self.filenames = self._generate_unique_filenames(self.arguments.filenames)
-        self.summary = {"filestofix": len(self.filenames),
+        self.linter = self.cache = self.configs = None
+        self.timings = self.summary = None
+        # Per file details are only emitted with --jsonlines, not kept
+        self.keepdetails = not arguments.jsonlines
+        self._resetsummary()
+
+    def _resetsummary(self):
+        """Reset the summary and timings."""
+        self.timings = Timings(self.arguments.timings)
+        self.summary = {"filestofix": 0,
                         "passed": 0,
                         "modified": 0,
                         "fixed": 0,
@@ -66,44 +142,53 @@ class YAMLFixer(YAMLFixerBase):
                         "nochangemode": self.arguments.nochange,
                         "details": {}}
 
-    def _matchesext(self, filename):
-        """Return True if filename matches the set of extensions, else False."""
-        return any(filename.endswith(ext) for ext in self.extensions)
-
-    def _recurse(self, path, fnmapping, level=0):
-        """Find all files in a directory recursively."""
-        self.debug(f"SCAN [{path}] at level {level} with limit {self.arguments.recurse}")
-        if (self.arguments.recurse < 0) or (level <= self.arguments.recurse):
-            with suppress(PermissionError), os.scandir(path) as dircontents:
-                for entry in dircontents:
-                    if entry.is_file() and self._matchesext(entry.name):
-                        # Ensures uniqueness based on absolute path
-                        fnmapping[os.path.abspath(entry.path)] = entry.path
-                    elif (entry.is_dir(follow_symlinks=self.arguments.followsymlinks)
-                          and ((self.arguments.recurse < 0) or (level < self.arguments.recurse))):
-                        self._recurse(entry.path, fnmapping, level + 1)
-
     def _generate_unique_filenames(self, fnames):
-        """Generate a list of unique filenames."""
-        fnmapping = {}
-        for name in fnames:
+        """Generate unique filenames, scanning directories as needed."""
+        scanner = Scanner(self.arguments, self.linter)
+        seen = set()
+        if self.arguments.staged or self.arguments.changedsince:
+            # Don't scan anything, just ask git
+            fnames = scanner.changed(fnames)
+        for name in sorted(fnames, key=lambda fname: sortkey(fname, os.path.isdir(fname))):
             # os.path.isdir() returns False instead of raising an exception
             # if we don't have sufficient permissions, so we have to do
             # a workaround to skip such directories
             try:
                 os.path.getsize(name)
             except PermissionError:
-                pass
+                continue
             except FileNotFoundError:
                 if name == '-':  # For <stdin>
-                    fnmapping[name] = name
+                    filenames = [name]
+                else:
+                    continue
             else:
                 if os.path.isdir(name):
-                    self._recurse(name, fnmapping)
+                    filenames = scanner.scan(name)
                 else:
-                    # Ensures uniqueness based on absolute path
-                    fnmapping[os.path.abspath(name)] = name
-        return sorted(fnmapping.values())
+                    filenames = [name]
+            for filename in filenames:
+                # Ensures uniqueness based on absolute path
+                absname = filename if filename == '-' else os.path.abspath(filename)
+                if absname not in seen:
+                    seen.add(absname)
+                    yield filename
+
+    def _discover(self, filenames=None):
+        """Generate the filenames to fix, measuring the time spent finding them.
+
+        Filenames which are already known are generated as is.
+        """
+        if filenames is not None:
+            yield from filenames
+            return
+        filenames = self._generate_unique_filenames(self.arguments.filenames)
+        while True:
+            with self.timings.phase("discovery"):
+                filename = next(filenames, None)
+            if filename is None:
+                return
+            yield filename
 
     def _statistics(self):
         """Output some statistics."""
@@ -130,6 +215,9 @@ class YAMLFixer(YAMLFixerBase):
                         # Yellow for unknown status
                         status = self.colorize(status, STATUSES[filedetails["numericstatus"]].get("color", "yellow"))
                 self.info(f"{status} {filename}{msg}")
+            if self.timings.enabled:
+                for phase in PHASES:
+                    self.info(f"{self.timings.phases[phase]:.3f}s spent in {phase}")
             if self.arguments.nochange:
                 message = "No file was modified per user's request !"
                 if self.arguments.summary:
@@ -137,46 +225,150 @@ class YAMLFixer(YAMLFixerBase):
                 else:
                     self.info(f"WARNING: {message}")  # Ensure it's not colorized
         elif self.arguments.jsonsummary:
+            import json  # pylint: disable=import-outside-toplevel
             self.info(json.dumps(self.summary, indent=4))
+        elif self.arguments.jsonlines:
+            import json  # pylint: disable=import-outside-toplevel
+            # The aggregate record, per file records were already emitted
+            self.info(json.dumps({key: value for (key, value) in self.summary.items() if key != "details"}))
 
     def listfixers(self):
         """List all the available fixers."""
-        availablefixers = []
-        for methodname in [m for m in dir(ProblemFixer) if m.startswith('fix_')]:
-            docstring = getattr(ProblemFixer, methodname).__doc__
-            for prob in [pb.strip()[2:] for pb in docstring.splitlines()[1:]]:
-                if prob:
-                    availablefixers.append(prob)
+        from .problemfixer import ProblemFixer  # pylint: disable=import-outside-toplevel
         self.info("Fixers:")
-        for fixstr in sorted(availablefixers):
+        for fixstr in sorted(ProblemFixer.fixers):
             if ((not fixstr.startswith("syntax error")) or (not self.arguments.nosyntax)):
                 self.info(f"  - {fixstr}")
         return EXIT_OK
 
-    def fix(self):
-        """Fix all files."""
+    def _fixall(self, filenames=None):
+        """Fix all files, yielding (filename, results) in filenames order.
+
+        Files are fixed while directories are still being scanned.
+        """
+        if self.arguments.pipeline:
+            from .pipeline import Pipeline  # pylint: disable=import-outside-toplevel
+            pipeline = Pipeline(self.arguments, self.linter, self.cache, self.configs)
+            yield from pipeline.results(self._discover(filenames))
+            return
+        batches = self._batches(self._discover(filenames))
+        jobs = self.arguments.jobs or os.cpu_count() or 1
+        if jobs == 1:
+            for batch in batches:
+                yield from zip(batch, fixfiles(self.arguments, self.linter, self.cache, batch, self.configs))
+        else:
+            from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+            self.debug(f"Fixing files with {jobs} worker processes")
+            with ProcessPoolExecutor(max_workers=jobs,
+                                     initializer=_initworker,
+                                     initargs=(self.arguments,)) as executor:
+                pending = deque()
+                for batch in batches:
+                    # stdin can only be read from the current process
+                    pending.append((batch, executor.submit(_fixfiles, batch) if batch != ['-'] else None))
+                    while len(pending) > PENDINGPERJOB * jobs:
+                        yield from self._nextresults(pending)
+                while pending:
+                    yield from self._nextresults(pending)
+
+    def _batches(self, filenames):
+        """Generate lists of at most --batchsize filenames, stdin being always alone."""
+        batch = []
+        for filename in filenames:
+            if filename == '-':
+                if batch:
+                    yield batch
+                    batch = []
+                yield [filename]
+            else:
+                batch.append(filename)
+                if len(batch) >= self.arguments.batchsize:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def _nextresults(self, pending):
+        """Return the (filename, results) pairs for the first pending batch of files."""
+        (batch, future) = pending.popleft()
+        if future is None:
+            return zip(batch, fixfiles(self.arguments, self.linter, self.cache, batch, self.configs))
+        return zip(batch, future.result())
+
+    def _addresult(self, uifilename, status, issues, handled, timings):
+        """Add a file's results to the summary."""
+        result = STATUSES.get(status, {"msg": f"unknown fixing status [{status}]",
+                                       "counter": "unknown"})
+        if status not in STATUSES:
+            self.error(f"{result['msg']}")
+        else:
+            self.debug(f"{result['msg']}")
+        self.summary["filestofix"] += 1
+        self.summary[result["counter"]] += 1
+        details = {"numericstatus": status,
+                   "status": result["counter"].upper(),
+                   "issues": issues,
+                   "handled": handled}
+        if timings is not None:
+            details["timings"] = timings
+            self.timings.merge(timings)
+        if self.arguments.jsonlines:
+            import json  # pylint: disable=import-outside-toplevel
+            self.info(json.dumps({"filename": uifilename, **details}))
+        if self.keepdetails:
+            self.summary["details"][uifilename] = details
+
+    def _fixandreport(self, filenames, diffto, report):
+        """Fix all files, writing their diffs and report's entries.
+
+        Returns the list of directories files were written to.
+        """
+        writtendirs = []
+        for (filename, (status, unidiff, issues, handled, timings, writtendir, entries)) in self._fixall(filenames):
+            uifilename = '<stdin>' if filename == '-' else filename
+            if writtendir is not None:
+                writtendirs.append(writtendir)
+            diffto.writelines(unidiff)
+            if entries:
+                report.add(uifilename, entries)
+            self._addresult(uifilename, status, issues, handled, timings)
+        if report is not None:
+            report.close()
+        return writtendirs
+
+    def prepare(self):
+        """Create the linter and the cache, unless already done."""
+        if self.linter is None:
+            self.linter = getlinter(self.arguments)
+            self.debug(f"Using the {self.linter.name} linter backend")
+            if self.arguments.prescan and not hasattr(self.linter, "enabledrules"):
+                self.warning("--prescan needs the in-process linter backend, and is ignored.")
+            if not self.arguments.nocache:
+                self.cache = FixCache(self.arguments)
+                self.debug(f"Using cache {self.cache.directory}")
+            if self.arguments.nestedconfig:
+                from .configs import ConfigResolver  # pylint: disable=import-outside-toplevel
+                self.configs = ConfigResolver(self.arguments)
+
+    def fix(self, filenames=None):
+        """Fix all files.
+
+        If a list of filenames is given, only these files are fixed,
+        without scanning anything, and diffs are appended to --diffto.
+        The linter and cache are kept from one call to the next.
+        """
+        self.prepare()
+        self._resetsummary()
         try:
-            with open(self.arguments.diffto, 'w', encoding='utf-8') as diffto:
-                for filename in self.filenames:
-                    if filename == '-':
-                        uifilename = '<stdin>'
-                    else:
-                        uifilename = filename
-                    filetofix = FileFixer(self.arguments, filename)
-                    self.debug(f"Fixing {uifilename} ... ")
-                    (status, unidiff) = filetofix.fix()
-                    diffto.writelines(unidiff)
-                    result = STATUSES.get(status, {"msg": f"unknown fixing status [{status}]",
-                                                   "counter": "unknown"})
-                    if status not in STATUSES:
-                        self.error(f"{result['msg']}")
-                    else:
-                        self.debug(f"{result['msg']}")
-                    self.summary[result["counter"]] += 1
-                    self.summary["details"][uifilename] = {"numericstatus": status,
-                                                           "status": result["counter"].upper(),
-                                                           "issues": filetofix.issues,
-                                                           "handled": filetofix.issueshandled}
+            with open(self.arguments.diffto, 'w' if filenames is None else 'a', encoding='utf-8') as diffto, \
+                 open(self.arguments.report or os.devnull, 'w', encoding='utf-8') as reportfile:
+                report = None
+                if self.arguments.report:
+                    from .report import REPORTS  # pylint: disable=import-outside-toplevel
+                    report = REPORTS[self.arguments.reportformat](reportfile)
+                writtendirs = self._fixandreport(filenames, diffto, report)
+
+            syncdirectories(self.arguments, writtendirs)
 
             # Remove diffto file if it's empty.
             if (not os.path.getsize(self.arguments.diffto)) and (self.arguments.diffto != os.devnull):
@@ -184,6 +376,12 @@ class YAMLFixer(YAMLFixerBase):
                 os.remove(self.arguments.diffto)
                 self.debug(f"Empty --diffto file {self.arguments.diffto} removed.")
 
+            if self.cache is not None:
+                self.cache.evict()
+
+            if self.timings.enabled:
+                self.summary["timings"] = self.timings.asdict()
+
             self._statistics()
             if (self.summary["passed"] + self.summary["skipped"] + self.summary["fixed"]) == self.summary["filestofix"]:
                 return EXIT_OK